@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from fract.model.backtest import BacktestTrader
+from fract.util.history import generate_history_dfs
+
+
+def load_config():
+    with open(
+            Path(__file__).resolve().parent.parent.joinpath(
+                'fract/static/default_fract.yml'
+            )
+    ) as f:
+        return yaml.safe_load(f)
+
+
+def generate_candle_dfs(days, instrument='EUR_USD', seed=0):
+    # S5 bid/ask candles with high and low prices
+    start = pd.Timestamp('2024-01-01', tz='UTC')
+    dfs = generate_history_dfs(
+        instruments=[instrument], start=start,
+        end=(start + pd.Timedelta(days=days) - pd.Timedelta(seconds=5)),
+        freq_sec=5, seed=seed
+    )
+    rng = np.random.default_rng(seed)
+    for df in dfs.values():
+        width = np.abs(rng.normal(scale=2e-5, size=len(df)))
+        for k in ['bid', 'ask']:
+            df[f'{k}_high'] = df[k] + width
+            df[f'{k}_low'] = df[k] - width
+        df['volume'] = rng.integers(1, 50, size=len(df)).astype(float)
+    return dfs
+
+
+def main(days=5, step='M1', trading_days_per_year=260):
+    logging.disable(logging.CRITICAL)
+    cf = load_config()
+    cf['oanda']['account_id'] = '101-001-0000000-001'
+    history_dfs = generate_candle_dfs(days=days)
+    trader = BacktestTrader(
+        model='ewma', config_dict=cf, history_dfs=history_dfs,
+        instruments=['EUR_USD'], step=step, quiet=True
+    )
+    t0 = time.perf_counter()
+    trader.invoke()
+    t = time.perf_counter() - t0
+    summary = trader.summary()
+    print(f'S5 candles:\t{days} days ({len(history_dfs["EUR_USD"])} bars)')
+    print(f'elapsed:\t{t:.1f} sec')
+    print('year (extrapolated):\t{:.1f} min'.format(
+        t / days * trading_days_per_year / 60
+    ))
+    print(f'transactions:\t{summary["transactions"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import timeit
+
+from bench_txnindex import generate_txns
+
+from fract.model.bet import BettingSystem
+
+
+def scan_pl_txns(txns, instrument):
+    return [
+        t for t in txns
+        if t.get('instrument') == instrument and t.get('pl')
+        and t.get('units')
+    ]
+
+
+def main(size=20000, number=100):
+    txns = generate_txns(size=size)
+    bs = BettingSystem(strategy="d'Alembert").update(txns)
+
+    def pandas_size():
+        return bs.calculate_size_by_pl(
+            unit_size=1000,
+            inst_pl_txns=scan_pl_txns(txns=txns, instrument='EUR_USD')
+        )
+
+    def stateful_size():
+        return bs.calculate_size(instrument='EUR_USD', unit_size=1000)
+
+    assert pandas_size() == stateful_size()
+    print('{:>28} {:>12}'.format('target', 'time [us]'))
+    for target, f in [
+            (f'calculate_size_by_pl ({size})', pandas_size),
+            ('calculate_size', stateful_size)
+    ]:
+        t = timeit.timeit(f, number=number) / number * 1e6
+        print(f'{target:>28} {t:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
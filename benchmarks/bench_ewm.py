@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from fract.util.ewm import RollingEwm
+
+
+def main(alpha=0.02, size=5000, number=100):
+    rng = np.random.default_rng(0)
+    s = pd.Series(rng.normal(scale=1e-5, size=size))
+    ewm = RollingEwm(alpha=alpha).append(times=s.index, values=s)
+    x_new = rng.normal(scale=1e-5, size=number)
+    times = iter(range(size, size + number))
+
+    def pandas_stats():
+        ewm = s.ewm(alpha=alpha)
+        return ewm.mean().iloc[-1], ewm.std().iloc[-1]
+
+    def rolling_stats():
+        t = next(times)
+        ewm.append(times=[t], values=x_new[(t - size):(t - size + 1)]).evict(
+            before=(t - size + 1)
+        )
+        return ewm.mean, ewm.std
+
+    print('{:>24} {:>12}'.format('target', 'time [us]'))
+    for target, f in [
+            (f'pandas ewm ({size})', pandas_stats),
+            ('RollingEwm (+1/-1)', rolling_stats)
+    ]:
+        t = timeit.timeit(f, number=number) / number * 1e6
+        print(f'{target:>24} {t:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
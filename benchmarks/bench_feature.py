@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from fract.model.feature import LogReturnFeature
+
+
+def pandas_feature(df_rate, code, drop_zero=False):
+    df_lr = df_rate.reset_index().assign(
+        log_diff=lambda d: np.log(d[['ask', 'bid']].mean(axis=1)).diff(),
+        delta_sec=lambda d: d['time'].diff().dt.total_seconds()
+    ).assign(
+        log_return=lambda d: d.assign(
+            weight=lambda e: np.reciprocal(
+                np.log(e['ask']) - np.log(e['bid'])
+            ).pipe(
+                lambda s: (s / s.mean()) * (e['volume'] / e['volume'].mean())
+            )
+        ).pipe(lambda e: e['log_diff'] * e['weight'])
+    ).pipe(
+        lambda d: (
+            d.iloc[d['log_return'].to_numpy().nonzero()[0]] if drop_zero
+            else d
+        )
+    )
+    if code == 'LR':
+        return df_lr['log_return'].set_axis(df_lr['time'])
+    df_lrv = df_lr.assign(lrv=lambda d: d['log_return'] / d['delta_sec'])
+    if code == 'LRV':
+        return df_lrv['lrv'].set_axis(df_lrv['time'])
+    df_lra = df_lrv.assign(lra=lambda d: d['lrv'].diff() / d['delta_sec'])
+    return df_lra['lra'].set_axis(df_lra['time'])
+
+
+def generate_candle_df(size, seed=0, freq_sec=5):
+    rng = np.random.default_rng(seed)
+    mid = np.exp(np.cumsum(rng.normal(scale=1e-4, size=size)))
+    mid[rng.random(size) < 0.2] = np.nan
+    mid = pd.Series(mid).ffill().bfill().to_numpy()
+    spread = rng.uniform(1e-5, 3e-5, size=size)
+    return pd.DataFrame(
+        {
+            'ask': mid + spread, 'bid': mid - spread,
+            'volume': rng.integers(1, 100, size=size)
+        },
+        index=pd.Index(
+            pd.to_datetime(
+                1600000000 + np.arange(size) * freq_sec, unit='s', utc=True
+            ).as_unit('ns'),
+            name='time'
+        )
+    )
+
+
+def main(size=5000, n_new=3, number=50):
+    df_all = generate_candle_df(size=(size + n_new * number))
+    windows = [
+        df_all.iloc[(i * n_new):(size + i * n_new)] for i in range(number + 1)
+    ]
+    print('{:>4} {:>9} {:>12} {:>12} {:>16} {:>8}'.format(
+        'code', 'drop_zero', 'pandas [us]', 'numpy [us]', 'incremental [us]',
+        'speedup'
+    ))
+    for code in ['LR', 'LRV', 'LRA']:
+        for drop_zero in [False, True]:
+            lrf = LogReturnFeature(
+                type={
+                    'LR': 'Log Return', 'LRV': 'LR Velocity',
+                    'LRA': 'LR Acceleration'
+                }[code],
+                drop_zero=drop_zero
+            )
+            for df in windows[:3]:
+                ref = pandas_feature(
+                    df_rate=df, code=code, drop_zero=drop_zero
+                )
+                res = lrf.series(df_rate=df, key='check')
+                assert ref.index.equals(res.index)
+                assert np.allclose(ref, res, rtol=1e-12, equal_nan=True)
+            t_pd = timeit.timeit(
+                lambda: pandas_feature(
+                    df_rate=windows[0], code=code, drop_zero=drop_zero
+                ),
+                number=number
+            ) / number * 1e6
+            t_np = timeit.timeit(
+                lambda: lrf.series(df_rate=windows[0]), number=number
+            ) / number * 1e6
+            lrf.series(df_rate=windows[0], key='bench')
+            dfs = iter(windows[1:])
+            t_inc = timeit.timeit(
+                lambda: lrf.series(df_rate=next(dfs), key='bench'),
+                number=number
+            ) / number * 1e6
+            print('{0:>4} {1:>9} {2:>12.1f} {3:>12.1f} {4:>16.1f}'.format(
+                code, str(drop_zero), t_pd, t_np, t_inc
+            ) + ' {:>7.1f}x'.format(t_pd / t_inc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+import timeit
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize_scalar
+
+from fract.util.kalmanfilter import KalmanFilter, KalmanFilterOptimizer
+
+
+def fit_loop(y, x0=0, v0=1e-8, q=1e-8, r=1e-8):
+    len_y = len(y)
+    new_x = np.empty(len_y)
+    new_v = np.empty(len_y)
+    for i, y_n in enumerate(y):
+        x_n_1 = (new_x[i - 1] if i else x0)
+        v_n_1 = (new_v[i - 1] if i else v0) + q
+        k = v_n_1 / (v_n_1 + r)
+        new_x[i] = x_n_1 + k * (y_n - x_n_1)
+        new_v[i] = (1 - k) * v_n_1
+    return pd.DataFrame({'y': y, 'x': new_x, 'v': new_v})
+
+
+def loss_loop(a, y, x0, v0, pmv_ratio=1):
+    r = np.exp(a)
+    return fit_loop(y=y, x0=x0, v0=v0, q=(r * pmv_ratio), r=r).pipe(
+        lambda d: np.sum(
+            np.log(d['v'] + r) + np.square(d['y'] - d['x']) / (d['v'] + r)
+        )
+    )
+
+
+def main(sizes=(5000, 50000), pmv_ratio=1e-3, number=5):
+    rng = np.random.default_rng(0)
+    print('{:>8} {:>14} {:>12} {:>12} {:>9}'.format(
+        'size', 'target', 'loop [ms]', 'fast [ms]', 'speedup'
+    ))
+    for n in sizes:
+        y = pd.Series(np.cumsum(rng.normal(scale=1e-5, size=n)) * 1e-2)
+        y_a = y.to_numpy()
+        r = np.var(y_a)
+        x_loop = fit_loop(y=y_a, q=(r * pmv_ratio), r=r)['x'].to_numpy()
+        x_fast = KalmanFilter.filter(
+            y=y_a, x0=0, v0=1e-8, q=(r * pmv_ratio), r=r
+        )[0]
+        assert np.allclose(x_loop, x_fast, rtol=1e-9, atol=0)
+        a = np.log(r)
+        for target, f_loop, f_fast in [
+                (
+                    'filter',
+                    lambda: fit_loop(y=y_a, q=(r * pmv_ratio), r=r),
+                    lambda: KalmanFilter(q=(r * pmv_ratio), r=r).fit(y=y)
+                ),
+                (
+                    'loss',
+                    lambda: loss_loop(a, y_a, 0, 1e-8, pmv_ratio),
+                    lambda: KalmanFilterOptimizer._loss(
+                        a, y_a, 0, 1e-8, pmv_ratio
+                    )
+                ),
+                (
+                    'optimize',
+                    lambda: minimize_scalar(
+                        fun=loss_loop, args=(y_a, 0, 1e-8, pmv_ratio),
+                        method='Golden'
+                    ),
+                    lambda: KalmanFilterOptimizer(
+                        y=y, pmv_ratio=pmv_ratio
+                    ).optimize()
+                )
+        ]:
+            t_loop = timeit.timeit(f_loop, number=number) / number * 1000
+            t_fast = timeit.timeit(f_fast, number=number) / number * 1000
+            print('{0:>8} {1:>14} {2:>12.3f} {3:>12.3f} {4:>8.1f}x'.format(
+                n, target, t_loop, t_fast, t_loop / t_fast
+            ))
+
+
+if __name__ == '__main__':
+    main()
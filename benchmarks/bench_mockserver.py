@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy as np
+import pandas as pd
+import v20
+
+from fract.model.mockserver import MockOandaServer
+from fract.util.history import generate_history_dfs
+
+
+def main(number=200, latency_sec=0, account_id='101-001-100000-001'):
+    now = pd.Timestamp.now(tz='UTC').floor('s')
+    server = MockOandaServer(
+        history_dfs=generate_history_dfs(
+            instruments=['EUR_USD', 'USD_JPY'],
+            start=(now - pd.Timedelta(days=1)),
+            end=(now + pd.Timedelta(hours=1)), seed=0
+        ),
+        account_id=account_id, port=0, latency_sec=latency_sec,
+        start=now.value
+    ).start()
+    api = v20.Context(
+        hostname=server.host, port=server.port, ssl=False, token=''
+    )
+    calls = [
+        ('account.get', lambda: api.account.get(account_id)),
+        (
+            'pricing.get',
+            lambda: api.pricing.get(account_id, instruments='EUR_USD,USD_JPY')
+        ),
+        (
+            'instrument.candles',
+            lambda: api.instrument.candles(
+                'EUR_USD', granularity='S5', count=5000, price='BA'
+            )
+        ),
+        (
+            'transaction.since',
+            lambda: api.transaction.since(account_id, id=0)
+        )
+    ]
+    print('{:>20} {:>10} {:>10}'.format('target', 'p50 [ms]', 'p99 [ms]'))
+    try:
+        for target, f in calls:
+            assert f().status == 200
+            t = list()
+            for _ in range(number):
+                t0 = time.perf_counter()
+                f()
+                t.append((time.perf_counter() - t0) * 1e3)
+            p50, p99 = np.percentile(t, [50, 99])
+            print(f'{target:>20} {p50:>10.2f} {p99:>10.2f}')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
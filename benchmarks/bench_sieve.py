@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import timeit
+
+import numpy as np
+import pandas as pd
+from bench_feature import generate_candle_df
+from statsmodels.stats.diagnostic import acorr_ljungbox
+
+from fract.model.sieve import LRFeatureSieve
+from fract.util.ljungbox import RollingLjungBox
+
+
+def main(size=5000, n_granularities=13, number=20, workers=4):
+    dfs = {
+        f'G{i}': generate_candle_df(size=(size + number), seed=i)
+        for i in range(n_granularities)
+    }
+    windows = [
+        {g: d.iloc[k:(k + size)] for g, d in dfs.items()}
+        for k in range(number + 1)
+    ]
+    x = pd.Series(
+        np.random.default_rng(0).normal(size=size),
+        index=windows[0]['G0'].index
+    )
+    print('{:>32} {:>12}'.format('target', 'time [ms]'))
+    for target, f in [
+            (
+                f'acorr_ljungbox ({size})',
+                lambda: acorr_ljungbox(x=x, lags=1, return_df=True)
+            ),
+            (
+                f'RollingLjungBox.append ({size})',
+                lambda: RollingLjungBox().append(times=x.index, values=x)
+            ),
+            (
+                f'extract_best_feature (cold x {n_granularities})',
+                lambda: LRFeatureSieve(
+                    type='LR Velocity'
+                ).extract_best_feature(history_dict=windows[0])
+            )
+    ]:
+        t = timeit.timeit(f, number=number) / number * 1e3
+        print(f'{target:>32} {t:>12.2f}')
+    for target, use_statsmodels, n_workers in [
+            (f'statsmodels turn (+1 x {n_granularities})', True, 1),
+            (f'rolling turn (+1 x {n_granularities})', False, 1),
+            (f'pooled turn (+1 x {n_granularities})', False, workers)
+    ]:
+        lrfs = LRFeatureSieve(
+            type='LR Velocity', use_statsmodels=use_statsmodels,
+            workers=n_workers
+        )
+        lrfs.extract_best_feature(history_dict=windows[0])
+        dicts = iter(windows[1:])
+        t = timeit.timeit(
+            lambda: lrfs.extract_best_feature(history_dict=next(dicts)),
+            number=number
+        ) / number * 1e3
+        print(f'{target:>32} {t:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
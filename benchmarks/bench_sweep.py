@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import timeit
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from fract.util.ewm import ewm_mean_std
+from fract.util.kalmanfilter import KalmanFilter
+
+
+def check_equivalence(y, alphas, qs, rs):
+    mean, std = ewm_mean_std(x=y, alphas=alphas)
+    for i, a in enumerate(alphas):
+        ewm = pd.Series(y).ewm(alpha=a)
+        assert np.allclose(mean[i], ewm.mean(), rtol=1e-9)
+        assert np.allclose(std[i], ewm.std(), rtol=1e-6, equal_nan=True)
+    x, v = KalmanFilter.filter_batch(y=y, x0=0, v0=1e-8, q=qs, r=rs)
+    for i, (q, r) in enumerate(zip(qs, rs)):
+        x_i, v_i = KalmanFilter.filter(y=y, x0=0, v0=1e-8, q=q, r=r)
+        assert np.allclose(x[i], x_i, rtol=1e-12, atol=1e-20)
+        assert np.allclose(v[i], v_i, rtol=1e-12)
+
+
+def main(size=100000, number=5):
+    rng = np.random.default_rng(0)
+    y = rng.normal(scale=1e-5, size=size)
+    alphas = np.array([0.005, 0.01, 0.02, 0.05, 0.1])
+    sigma_bands = np.array([0, 0.1, 0.2, 0.5, 1.0])
+    rs = np.full(3, 1e-10)
+    qs = rs * np.array([1e-4, 1e-3, 1e-2])
+    check_equivalence(y=y[:5000], alphas=alphas, qs=qs, rs=rs)
+
+    def pandas_ewm_loop():
+        # recompute the statistics for every grid point
+        for a, s in product(alphas, sigma_bands):
+            ewm = pd.Series(y).ewm(alpha=a)
+            m = ewm.mean().to_numpy()
+            w = ewm.std().to_numpy() * s
+            np.count_nonzero((m - w > 0) | (m + w < 0))
+
+    def batch_ewm():
+        mean, std = ewm_mean_std(x=y, alphas=alphas)
+        for (i, _), s in product(enumerate(alphas), sigma_bands):
+            w = std[i] * s
+            np.count_nonzero((mean[i] - w > 0) | (mean[i] + w < 0))
+
+    n_grid = alphas.size * sigma_bands.size
+    print('{:>28} {:>12}'.format('target', 'time [ms]'))
+    for target, f in [
+            (f'pandas ewm x {n_grid}', pandas_ewm_loop),
+            (f'ewm_mean_std ({alphas.size} alphas)', batch_ewm)
+    ]:
+        t = timeit.timeit(f, number=number) / number * 1e3
+        print(f'{target:>28} {t:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
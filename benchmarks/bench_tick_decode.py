@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from fract.util import tickparser
+
+
+def generate_tick_strs(size, seed=0):
+    rng = np.random.default_rng(seed)
+    mid = np.round(1.1 + np.cumsum(rng.normal(scale=1e-5, size=size)), 5)
+    times = pd.to_datetime(
+        1600000000 * 10**9 + np.cumsum(rng.integers(1, 10**9, size=size)),
+        unit='ns', utc=True
+    )
+    return [
+        json.dumps({
+            'type': 'PRICE', 'instrument': 'EUR_USD',
+            'time': t.strftime('%Y-%m-%dT%H:%M:%S.%f') + '{:03d}Z'.format(
+                t.nanosecond
+            ),
+            'tradeable': True,
+            'closeoutBid': m - 5e-5, 'closeoutAsk': m + 5e-5
+        }).encode() for t, m in zip(times, mid)
+    ]
+
+
+def decode_by_dicts(strs, instrument='EUR_USD'):
+    cached_rates = [json.loads(s) for s in strs]
+    return pd.DataFrame([
+        {'time': r['time'], 'bid': r['closeoutBid'], 'ask': r['closeoutAsk']}
+        for r in cached_rates
+    ]).assign(
+        time=lambda d: pd.to_datetime(d['time']), instrument=instrument
+    ).set_index('time')
+
+
+def decode_by_columns(strs, instrument='EUR_USD'):
+    ticks = tickparser.parse_ticks(strs=strs)
+    return pd.DataFrame(
+        {'bid': ticks['bid'], 'ask': ticks['ask'], 'instrument': instrument},
+        index=pd.DatetimeIndex(
+            ticks['time'].view('datetime64[ns]'), name='time'
+        ).tz_localize('UTC'),
+        copy=False
+    )
+
+
+def main(sizes=(1000, 10000), number=20):
+    decoder = ('orjson' if tickparser.orjson else 'json')
+    print('{:>6} {:>12} {:>14} {:>8}'.format(
+        'ticks', 'dicts [ms]', f'{decoder} [ms]', 'speedup'
+    ))
+    for size in sizes:
+        strs = generate_tick_strs(size=size)
+        ref = decode_by_dicts(strs=strs)
+        res = decode_by_columns(strs=strs)
+        assert np.array_equal(
+            ref.index.values.astype('datetime64[ns]'),
+            res.index.values.astype('datetime64[ns]')
+        )
+        assert np.array_equal(ref[['bid', 'ask']], res[['bid', 'ask']])
+        t_ref = timeit.timeit(
+            lambda: decode_by_dicts(strs=strs), number=number
+        ) / number * 1e3
+        t_res = timeit.timeit(
+            lambda: decode_by_columns(strs=strs), number=number
+        ) / number * 1e3
+        print('{0:>6} {1:>12.2f} {2:>14.2f} {3:>7.1f}x'.format(
+            size, t_ref, t_res, t_ref / t_res
+        ))
+
+
+if __name__ == '__main__':
+    main()
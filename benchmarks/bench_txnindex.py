@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import sys
+import timeit
+from pathlib import Path
+
+from fract.util.txnindex import TransactionIndex
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.joinpath('tests')))
+from conftest import generate_txns  # noqa: E402 isort:skip
+
+
+def main(size=20000, number=100):
+    txns = generate_txns(size=size)
+    index = TransactionIndex().add(txns, write_log=False)
+
+    def scan_lookup():
+        return sum(
+            float(t['pl']) for t in txns
+            if t.get('instrument') == 'EUR_USD' and t.get('pl')
+        )
+
+    def index_lookup():
+        return index.net_pl(instrument='EUR_USD')
+
+    print('{:>24} {:>12}'.format('target', 'time [us]'))
+    for target, f in [
+            (f'list scan ({size})', scan_lookup),
+            ('TransactionIndex', index_lookup)
+    ]:
+        t = timeit.timeit(f, number=number) / number * 1e6
+        print(f'{target:>24} {t:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
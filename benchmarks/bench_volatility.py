@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import timeit
+
+import numpy as np
+from bench_feature import generate_candle_df
+
+from fract.util.volatility import VolatilityTracker
+
+
+def pandas_volatility_state(df, window=6, quantile=0.25):
+    v = (
+        np.log(df[['ask', 'bid']].mean(axis=1)).diff().rolling(
+            window=window
+        ).std(ddof=0) * df['volume']
+    ).dropna()
+    threshold = v.quantile(quantile)
+    return v.iloc[-1], threshold, (v.iloc[-1] > threshold)
+
+
+def main(size=5000, window=6, quantile=0.25, number=200):
+    df_all = generate_candle_df(size=(size + number), freq_sec=300)
+    windows = [df_all.iloc[i:(size + i)] for i in range(number + 1)]
+    tracker = VolatilityTracker(window=window, size=size, quantile=quantile)
+    for df in windows:
+        tracker.update(df_candle=df)
+        value, threshold, is_active = pandas_volatility_state(
+            df=df, window=window, quantile=quantile
+        )
+        assert np.isclose(tracker.value, value, rtol=1e-9)
+        assert np.isclose(tracker.threshold, threshold, rtol=1e-9)
+        assert tracker.is_active == is_active
+    new_windows = iter(
+        [
+            df_all.iloc[(i % number):(size + i % number)]
+            for i in range(number * 2)
+        ]
+    )
+    incremental = VolatilityTracker(
+        window=window, size=size, quantile=quantile
+    ).update(df_candle=windows[0])
+    print('{:>28} {:>12}'.format('target', 'time [us]'))
+    for target, f in [
+            (
+                f'pandas ({size} candles)',
+                lambda: pandas_volatility_state(
+                    df=windows[-1], window=window, quantile=quantile
+                )
+            ),
+            (
+                'VolatilityTracker (+1)',
+                lambda: incremental.update(df_candle=next(new_windows))
+            )
+    ]:
+        t = timeit.timeit(f, number=number) / number * 1e6
+        print(f'{target:>28} {t:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
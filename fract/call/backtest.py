@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+import logging
+
+from oandacli.util.config import read_yml
+
+from ..model.backtest import BacktestTrader
+from ..util.history import read_history_dfs
+
+
+def run_backtest(config_yml, data_path, instruments=None, model='ewma',
+                 step='M1', start=None, end=None, log_dir_path=None,
+                 quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Backtesting')
+    cf = read_yml(path=config_yml)
+    history_dfs = read_history_dfs(path=data_path, instruments=instruments)
+    trader = BacktestTrader(
+        model=model, config_dict=cf, history_dfs=history_dfs,
+        instruments=instruments, step=step, start=start, end=end,
+        log_dir_path=log_dir_path, quiet=quiet
+    )
+    logger.info('Invoke a backtest trader')
+    trader.invoke()
+    return trader.summary()
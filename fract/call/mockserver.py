@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+import logging
+
+import pandas as pd
+from oandacli.util.config import read_yml
+
+from ..model.mockserver import MockOandaServer
+from ..util.history import generate_history_dfs, read_history_dfs
+
+
+def run_mock_server(config_yml, data_path=None, instruments=None,
+                    host='127.0.0.1', port=8080, latency_sec=None,
+                    jitter_sec=None, speed=None, seed=None):
+    logger = logging.getLogger(__name__)
+    logger.info('Serving a mock Oanda API')
+    cf = read_yml(path=config_yml)
+    ms = cf.get('mockserver', dict())
+    bt = cf.get('backtest', dict())
+    if data_path:
+        history_dfs = read_history_dfs(path=data_path, instruments=instruments)
+        start = (
+            min(d.index[0] for d in history_dfs.values())
+            + pd.Timedelta(seconds=float(bt.get('warmup_sec', 3600)))
+        ).value
+    else:
+        now = pd.Timestamp.now(tz='UTC').floor('s')
+        delta = pd.Timedelta(seconds=float(ms.get('synthetic_sec', 86400)))
+        history_dfs = generate_history_dfs(
+            instruments=(instruments or cf['instruments']),
+            start=(now - delta), end=(now + delta),
+            currency=bt.get('currency', 'USD'),
+            seed=(int(seed) if seed is not None else None)
+        )
+        start = now.value
+    server = MockOandaServer(
+        history_dfs=history_dfs, account_id=cf['oanda']['account_id'],
+        host=host, port=int(port),
+        latency_sec=float(
+            latency_sec if latency_sec is not None
+            else ms.get('latency_sec', 0)
+        ),
+        jitter_sec=float(
+            jitter_sec if jitter_sec is not None
+            else ms.get('jitter_sec', 0)
+        ),
+        speed=float(speed if speed is not None else ms.get('speed', 1)),
+        start=start, heartbeat_sec=float(ms.get('heartbeat_sec', 5)),
+        balance=bt.get('balance', 1000000),
+        currency=bt.get('currency', 'USD'),
+        margin_rate=bt.get('margin_rate', 0.04),
+        seed=(int(seed) if seed is not None else None)
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info('Shut down the mock server')
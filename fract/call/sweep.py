@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+
+import logging
+from pathlib import Path
+
+from oandacli.util.config import read_yml
+
+from ..model.sweep import ParameterSweep
+from ..util.history import read_history_dfs
+
+
+def run_sweep(config_yml, data_path, instruments=None, model='ewma',
+              granularity='S5', workers=1, csv_path=None, quiet=False):
+    logger = logging.getLogger(__name__)
+    logger.info('Sweeping model parameters')
+    cf = read_yml(path=config_yml)
+    history_dfs = read_history_dfs(path=data_path, instruments=instruments)
+    df_sweep = ParameterSweep(
+        config_dict=cf, model=model, granularity=granularity,
+        workers=workers
+    ).run(history_dfs=history_dfs)
+    if not quiet:
+        print(df_sweep.to_string())
+    if csv_path:
+        logger.info(f'Write CSV:\t{csv_path}')
+        df_sweep.to_csv(str(Path(csv_path).resolve()), index=False)
+    return df_sweep
@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 
 import logging
+import multiprocessing as mp
+from multiprocessing.connection import wait
+from pathlib import Path
 
 from oandacli.util.config import read_yml
 
@@ -11,16 +14,82 @@ from ..model.standalone import StandaloneTrader
 def invoke_trader(config_yml, instruments=None, model='ewma', interval_sec=0,
                   timeout_sec=3600, standalone=False, redis_host=None,
                   redis_port=6379, redis_db=0, log_dir_path=None,
-                  ignore_api_error=False, quiet=False, dry_run=False):
+                  ignore_api_error=False, quiet=False, dry_run=False,
+                  workers=1):
     logger = logging.getLogger(__name__)
     logger.info('Autonomous trading')
     cf = read_yml(path=config_yml)
+    insts = (instruments or cf['instruments'])
+    n_workers = min(int(workers or 1), len(insts))
+    trader_kwargs = {
+        'model': model, 'interval_sec': interval_sec,
+        'timeout_sec': timeout_sec, 'standalone': standalone,
+        'redis_host': redis_host, 'redis_port': redis_port,
+        'redis_db': redis_db, 'ignore_api_error': ignore_api_error,
+        'quiet': quiet, 'dry_run': dry_run
+    }
+    if n_workers > 1:
+        logger.info(f'Invoke {n_workers} traders')
+        cf_w = {
+            **cf,
+            'oanda': {
+                **cf['oanda'],
+                'rate_limit': (
+                    float(cf['oanda'].get('rate_limit', 100)) / n_workers
+                )
+            }
+        }
+        order_lock = (mp.Lock() if standalone else None)
+        procs = [
+            mp.Process(
+                target=_run_trader,
+                kwargs={
+                    'config_dict': cf_w, 'instruments': insts[k::n_workers],
+                    'log_dir_path': (
+                        str(Path(log_dir_path).joinpath(f'worker{k}'))
+                        if log_dir_path else None
+                    ),
+                    'order_lock': order_lock, 'shared_order_lock': True,
+                    **trader_kwargs
+                },
+                name=f'fract-worker{k}'
+            ) for k in range(n_workers)
+        ]
+        for p in procs:
+            p.start()
+        running = {p.sentinel: p for p in procs}
+        try:
+            while running:
+                for s in wait(list(running.keys())):
+                    p = running.pop(s)
+                    p.join()
+                    if p.exitcode != 0:
+                        raise RuntimeError(
+                            f'worker failed:\t{p.name} ({p.exitcode})'
+                        )
+        finally:
+            for p in running.values():
+                p.terminate()
+                p.join()
+    else:
+        _run_trader(
+            config_dict=cf, instruments=instruments,
+            log_dir_path=log_dir_path, **trader_kwargs
+        )
+
+
+def _run_trader(config_dict, instruments, model, interval_sec, timeout_sec,
+                standalone, redis_host, redis_port, redis_db, log_dir_path,
+                ignore_api_error, quiet, dry_run, order_lock=None,
+                shared_order_lock=False):
+    logger = logging.getLogger(__name__)
+    cf = config_dict
     if standalone:
         trader = StandaloneTrader(
             model=model, config_dict=cf, instruments=instruments,
             interval_sec=interval_sec, timeout_sec=timeout_sec,
-            log_dir_path=log_dir_path, ignore_api_error=ignore_api_error,
-            quiet=quiet, dry_run=False
+            log_dir_path=log_dir_path, order_lock=order_lock,
+            ignore_api_error=ignore_api_error, quiet=quiet, dry_run=dry_run
         )
     else:
         rd = cf['redis'] if 'redis' in cf else {}
@@ -29,9 +98,15 @@ def invoke_trader(config_yml, instruments=None, model='ewma', interval_sec=0,
             redis_host=(redis_host or rd.get('host')),
             redis_port=(redis_port or rd.get('port')),
             redis_db=(redis_db if redis_db is not None else rd.get('db')),
+            redis_mode=rd.get('mode', 'list'),
+            event_driven=rd.get('event_driven', False),
+            order_lock_name=(
+                rd.get('order_lock', 'fract:order_lock') if shared_order_lock
+                else rd.get('order_lock')
+            ),
             interval_sec=interval_sec, timeout_sec=timeout_sec,
             log_dir_path=log_dir_path, ignore_api_error=ignore_api_error,
-            quiet=quiet, dry_run=False
+            quiet=quiet, dry_run=dry_run
         )
     logger.info('Invoke a trader')
     trader.invoke()
@@ -26,8 +26,18 @@ Usage:
     fract open [--debug|--info] [--file=<yaml>] [--model=<str>]
                [--interval=<sec>] [--timeout=<sec>] [--standalone]
                [--redis-host=<ip>] [--redis-port=<int>] [--redis-db=<int>]
-               [--log-dir=<path>] [--ignore-api-error] [--quiet] [--dry-run]
-               [<instrument>...]
+               [--log-dir=<path>] [--workers=<int>] [--ignore-api-error]
+               [--quiet] [--dry-run] [<instrument>...]
+    fract backtest [--debug|--info] [--file=<yaml>] [--model=<str>]
+                   [--step=<code>] [--from=<date>] [--to=<date>]
+                   [--log-dir=<path>] [--quiet] <data_path> [<instrument>...]
+    fract sweep [--debug|--info] [--file=<yaml>] [--model=<str>]
+                [--granularity=<code>] [--workers=<int>] [--csv=<path>]
+                [--quiet] <data_path> [<instrument>...]
+    fract mockserver [--debug|--info] [--file=<yaml>] [--data=<path>]
+                     [--host=<ip>] [--port=<int>] [--latency=<sec>]
+                     [--jitter=<sec>] [--speed=<float>] [--seed=<int>]
+                     [<instrument>...]
 
 Options:
     -h, --help          Print help and exit
@@ -38,7 +48,8 @@ Options:
     --csv-dir=<path>    Write data with daily CSV in a directory
     --sqlite=<path>     Save data in an SQLite3 database
     --granularity=<code>
-                        Set a granularity for rate tracking [default: S5]
+                        Set a granularity for rate tracking or sweeping
+                        [default: S5]
     --count=<int>       Set a size for rate tracking (max: 5000) [default: 60]
     --json              Print data with JSON
     --target=<str>      Set a streaming target [default: pricing]
@@ -57,9 +68,18 @@ Options:
     --standalone        Invoke a trader with standalone mode
     --log-dir=<path>    Write output log files in a directory
     --dry-run           Invoke a trader with dry-run mode
+    --workers=<int>     Set a number of worker processes [default: 1]
+    --step=<code>       Set a granularity of backtest decisions [default: M1]
     --from=<date>       Specify the starting time
     --to=<date>         Specify the ending time
     --pl-graph=<path>   Visualize PL in a graphics file such as PDF or PNG
+    --data=<path>       Serve rate history instead of synthetic prices
+    --host=<ip>         Set a host to listen on [default: 127.0.0.1]
+    --port=<int>        Set a port to listen on [default: 8080]
+    --latency=<sec>     Set seconds added to each response
+    --jitter=<sec>      Set uniform +/- seconds of response latency
+    --speed=<float>     Set rate history seconds replayed per second
+    --seed=<int>        Set a random seed
 
 Commands:
     init                Create a YAML template for configuration
@@ -71,6 +91,9 @@ Commands:
     spread              Print the ratios of spread to price
     close               Close positions (if not <instrument>, close all)
     open                Invoke an autonomous trader
+    backtest            Replay rate history with a simulated broker
+    sweep               Evaluate a grid of model parameters on rate history
+    mockserver          Serve a local mock of the Oanda v20 API
 
 Arguments:
     <info_target>       { instruments, prices, account, accounts, orders,
@@ -88,8 +111,19 @@ Arguments:
                           USD_CNH, USD_CZK, USD_DKK, USD_HKD, USD_HUF, USD_INR,
                           USD_JPY, USD_MXN, USD_NOK, USD_PLN, USD_SAR, USD_SEK,
                           USD_SGD, USD_THB, USD_TRY, USD_ZAR, ZAR_JPY }
-    <data_path>         Path to an input CSV or SQLite file
+    <data_path>         Path to an input CSV, SQLite, or Parquet file
+                        (or a directory of them)
     <graph_path>        Path to an output graphics file such as PDF or PNG
+
+Redis:
+    With `redis.mode: list` in the YAML, `open` pops price JSON strings from
+    the lists named after the instruments (as written by `stream --use-redis`).
+    With `redis.mode: stream`, it reads Redis Streams named after the
+    instruments, and each entry must carry a price JSON in a `data` field:
+        XADD <instrument> * data <price JSON>
+    A price JSON is a v20 pricing stream PRICE message, which has `time`,
+    `closeoutBid`, `closeoutAsk`, and `tradeable`.
+    Entries without a `data` field are skipped with a warning.
 """
 
 import logging
@@ -102,6 +136,9 @@ from oandacli.util.config import fetch_config_yml_path, write_config_yml
 from oandacli.util.logger import set_log_config
 
 from .. import __version__
+from ..call.backtest import run_backtest
+from ..call.mockserver import run_mock_server
+from ..call.sweep import run_sweep
 from ..call.trader import invoke_trader
 
 
@@ -130,7 +167,29 @@ def main():
             redis_host=args['--redis-host'], redis_port=args['--redis-port'],
             redis_db=args['--redis-db'], log_dir_path=args['--log-dir'],
             ignore_api_error=args['--ignore-api-error'], quiet=args['--quiet'],
-            dry_run=args['--dry-run']
+            dry_run=args['--dry-run'], workers=args['--workers']
+        )
+    elif args['backtest']:
+        run_backtest(
+            config_yml=config_yml_path, data_path=args['<data_path>'],
+            instruments=args['<instrument>'], model=args['--model'],
+            step=args['--step'], start=args['--from'], end=args['--to'],
+            log_dir_path=args['--log-dir'], quiet=args['--quiet']
+        )
+    elif args['sweep']:
+        run_sweep(
+            config_yml=config_yml_path, data_path=args['<data_path>'],
+            instruments=args['<instrument>'], model=args['--model'],
+            granularity=args['--granularity'], workers=args['--workers'],
+            csv_path=args['--csv'], quiet=args['--quiet']
+        )
+    elif args['mockserver']:
+        run_mock_server(
+            config_yml=config_yml_path, data_path=args['--data'],
+            instruments=args['<instrument>'], host=args['--host'],
+            port=args['--port'], latency_sec=args['--latency'],
+            jitter_sec=args['--jitter'], speed=args['--speed'],
+            seed=args['--seed']
         )
     else:
         execute_command(args=args, config_yml_path=config_yml_path)
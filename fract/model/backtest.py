@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+import logging
+import os
+from pathlib import Path
+from pprint import pformat
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from ..util.granularity import granularity2sec
+from .base import BaseTrader
+from .broker import SimulatedBroker, SimulatedContext
+
+
+class BacktestTrader(BaseTrader):
+    def __init__(self, model, config_dict, history_dfs, instruments=None,
+                 step='M1', start=None, end=None, log_dir_path=None,
+                 quiet=False):
+        bt = config_dict.get('backtest', dict())
+        insts = [
+            i for i in (instruments or config_dict['instruments'])
+            if i in history_dfs
+        ] or sorted(history_dfs.keys())
+        data_start = min(d.index[0] for d in history_dfs.values())
+        self.__start = (
+            pd.to_datetime(start, utc=True) if start
+            else data_start + pd.Timedelta(
+                seconds=float(bt.get('warmup_sec', 3600))
+            )
+        ).value
+        self.__end = (pd.to_datetime(end, utc=True).value if end else None)
+        self.__broker = SimulatedBroker(
+            history_dfs=history_dfs,
+            account_id=config_dict['oanda']['account_id'],
+            balance=bt.get('balance', 1000000),
+            currency=bt.get('currency', 'USD'),
+            margin_rate=bt.get('margin_rate', 0.04), start=self.__start
+        )
+        super().__init__(
+            model=model, standalone=(not self.__broker.has_ticks),
+            ignore_api_error=False,
+            config_dict={
+                **config_dict,
+                'oanda': {
+                    **config_dict['oanda'], 'rate_limit': None,
+                    'max_workers': 1
+                }
+            },
+            instruments=insts, log_dir_path=log_dir_path,
+            api=SimulatedContext(broker=self.__broker), quiet=quiet,
+            dry_run=False
+        )
+        self.__logger = logging.getLogger(__name__)
+        self.__step_sec = (granularity2sec(step) or 1)
+        self.__log_dir_path = log_dir_path
+        self.__last_times = dict()
+        self.__logger.debug('vars(self):\t' + pformat(vars(self)))
+
+    def now(self):
+        return pd.Timestamp(self.__broker.now, tz='UTC')
+
+    def sleep(self, secs):
+        pass
+
+    def check_health(self):
+        t = self.__broker.next_time(step_sec=self.__step_sec)
+        if t is None or (self.__end and t > self.__end):
+            self.__broker.advance(
+                time=max(self.__end or self.__broker.now, self.__broker.now)
+            )
+            self._report()
+            return False
+        else:
+            self.__broker.advance(time=t)
+            return True
+
+    def select_instruments(self):
+        return [
+            i for i in self.instruments
+            if self._fetch_rate_df(instrument=i, peek=True)
+        ]
+
+    def make_decision(self, instrument):
+        df_r = self._fetch_rate_df(instrument=instrument)
+        if df_r.size:
+            self.update_caches(df_rate=df_r)
+            st = self.determine_sig_state(df_rate=df_r)
+            self.print_state_line(df_rate=df_r, add_str=st['log_str'])
+            self.design_and_place_order(instrument=instrument, act=st['act'])
+            self.write_turn_log(
+                df_rate=df_r,
+                **{k: v for k, v in st.items() if not k.endswith('log_str')}
+            )
+
+    def _fetch_rate_df(self, instrument, peek=False):
+        s = self.__broker.rate_slice(
+            instrument=instrument, since=self.__last_times.get(instrument)
+        )
+        if peek:
+            return (s.start < s.stop)
+        elif s.start == s.stop:
+            return pd.DataFrame()
+        else:
+            a = self.__broker.rate_arrays(
+                instrument=instrument,
+                since=self.__last_times.get(instrument)
+            )
+            self.__last_times[instrument] = int(a['avail'][-1])
+            return pd.DataFrame(
+                {'bid': a['bid'], 'ask': a['ask'], 'instrument': instrument},
+                index=pd.DatetimeIndex(
+                    a['avail'].view('datetime64[ns]'), name='time'
+                ).tz_localize('UTC'),
+                copy=False
+            )
+
+    def fetch_candle_df(self, instrument, granularity='S5', count=5000,
+                        from_time=None):
+        # the candles endpoint without building v20 objects
+        c = self.__broker.candle_arrays(
+            instrument=instrument, granularity=granularity, count=count,
+            from_time=from_time
+        )
+        return pd.DataFrame(
+            {
+                'bid': c['bid_c'], 'ask': c['ask_c'],
+                'volume': c['volume'].astype(int), 'instrument': instrument
+            },
+            index=pd.DatetimeIndex(
+                c['start'].view('datetime64[ns]'), name='time'
+            ).tz_localize('UTC'),
+            copy=False
+        )
+
+    def _report(self):
+        summary = self.summary()
+        self.print_log(
+            'Backtest:' + os.linesep
+            + yaml.dump(summary, default_flow_style=False).strip()
+        )
+        if self.__log_dir_path:
+            self._write_data(
+                yaml.dump(summary, default_flow_style=False).strip(),
+                path=str(
+                    Path(self.__log_dir_path).resolve().joinpath(
+                        'backtest.yml'
+                    )
+                ),
+                mode='w'
+            )
+
+    def summary(self):
+        return {
+            **self.__broker.summary(),
+            'decision_start': str(
+                np.datetime64(self.__start, 'ns')
+            ) + 'Z'
+        }
@@ -1,12 +1,12 @@
 #!/usr/bin/env python
 
-import json
 import logging
 import os
 import signal
 import time
 from abc import ABCMeta, abstractmethod
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from math import ceil
 from pathlib import Path
 from pprint import pformat
@@ -17,9 +17,17 @@ import yaml
 from oandacli.util.logger import log_response
 from v20 import Context, V20ConnectionError, V20Timeout
 
+from ..util.granularity import granularity2sec
+from ..util.metrics import TurnMetrics
+from ..util.ratelimit import TokenBucket
+from ..util.ringbuffer import RingBuffer
+from ..util.tickparser import parse_rfc3339_ns
+from ..util.txnindex import TransactionIndex, read_txn_log
+from ..util.volatility import VolatilityTracker
 from .bet import BettingSystem
 from .ewma import Ewma
 from .kalman import Kalman
+from .streaming import TransactionStream
 
 
 class APIResponseError(RuntimeError):
@@ -28,18 +36,31 @@ class APIResponseError(RuntimeError):
 
 class TraderCore(object):
     def __init__(self, config_dict, instruments, log_dir_path=None,
-                 quiet=False, dry_run=False):
+                 order_lock=None, api=None, quiet=False, dry_run=False):
         self.__logger = logging.getLogger(__name__)
         self.cf = config_dict
-        self.__api = Context(
-            hostname='api-fx{}.oanda.com'.format(
-                self.cf['oanda']['environment']
+        self.__api = api or Context(
+            hostname=(
+                self.cf['oanda'].get('hostname')
+                or 'api-fx{}.oanda.com'.format(self.cf['oanda']['environment'])
             ),
+            port=int(self.cf['oanda'].get('port') or 443),
+            ssl=self.cf['oanda'].get('ssl', True),
             token=self.cf['oanda']['token']
         )
         self.__account_id = self.cf['oanda']['account_id']
+        rate_limit = self.cf['oanda'].get('rate_limit', 100)
+        self.__token_bucket = (
+            TokenBucket(rate=rate_limit) if rate_limit else None
+        )
+        n_workers = int(self.cf['oanda'].get('max_workers', 4))
+        self.__executor = (
+            ThreadPoolExecutor(max_workers=n_workers) if n_workers > 1
+            else None
+        )
         self.instruments = (instruments or self.cf['instruments'])
         self.__bs = BettingSystem(strategy=self.cf['position']['bet'])
+        self.__order_lock = order_lock
         self.__quiet = quiet
         self.__dry_run = dry_run
         if log_dir_path:
@@ -65,18 +86,57 @@ class TraderCore(object):
             self.__log_dir_path = None
             self.__order_log_path = None
             self.__txn_log_path = None
+        metrics_cf = self.cf.get('metrics', dict())
+        self.metrics = TurnMetrics(
+            path=(
+                str(Path(self.__log_dir_path).joinpath('metrics.prom'))
+                if self.__log_dir_path and metrics_cf.get('enabled')
+                else None
+            ),
+            interval_sec=metrics_cf.get('interval_sec', 60)
+        )
         self.__last_txn_id = None
         self.pos_dict = dict()
         self.balance = None
         self.margin_avail = None
         self.__account_currency = None
-        self.txn_list = list()
+        self.txn_index = TransactionIndex(log_path=self.__txn_log_path)
+        if self.__txn_log_path and Path(self.__txn_log_path).is_file():
+            self.__logger.info(f'Replay transactions:\t{self.__txn_log_path}')
+            for txns in read_txn_log(path=self.__txn_log_path):
+                t_acc = [
+                    t for t in txns if t.get('accountID') == self.__account_id
+                ]
+                if t_acc:
+                    self.txn_index.add(t_acc, write_log=False)
+                    self.__bs.update(t_acc)
+                    self.__last_txn_id = t_acc[-1]['id']
+        self.__txn_stream = (
+            TransactionStream(
+                config_dict=self.cf,
+                timeout_sec=self.cf['oanda'].get('stream_timeout_sec', 10),
+                metrics=self.metrics
+            ) if self.cf['oanda'].get('txn_stream') and not api else None
+        )
+        self.__reconcile_sec = float(
+            self.cf['oanda'].get('reconcile_sec', 60)
+        )
+        self.__reconcile_time = None
+        self.__reconciled_connections = 0
+        self.__account_txn_id = 0       # last transaction in pos_dict
+        self.__expected_txn_id = 0      # last transaction known to exist
         self.__inst_dict = dict()
+        self.__inst_ttl_sec = float(
+            self.cf['oanda'].get('instrument_ttl_sec', 3600)
+        )
+        self.__inst_refresh_time = None
         self.price_dict = dict()
         self.unit_costs = dict()
 
     def _refresh_account_dicts(self):
-        res = self.__api.account.get(accountID=self.__account_id)
+        res = self._call_api(
+            self.__api.account.get, accountID=self.__account_id
+        )
         # log_response(res, logger=self.__logger)
         if 'account' in res.body:
             acc = res.body['account']
@@ -84,6 +144,10 @@ class TraderCore(object):
             raise APIResponseError(
                 'unexpected response:' + os.linesep + pformat(res.body)
             )
+        self.__account_txn_id = int(res.body.get('lastTransactionID') or 0)
+        if self.__txn_stream:
+            self.__reconcile_time = time.monotonic()
+            self.__reconciled_connections = self.__txn_stream.connections
         self.balance = float(acc.balance)
         self.margin_avail = float(acc.marginAvailable)
         self.__account_currency = acc.currency
@@ -99,7 +163,7 @@ class TraderCore(object):
             if p0 and all([p0[k] == d[k] for k in ['side', 'units']]):
                 self.pos_dict[i]['dt'] = p0['dt']
             else:
-                self.pos_dict[i]['dt'] = datetime.now()
+                self.pos_dict[i]['dt'] = self.now()
 
     def _place_order(self, closing=False, **kwargs):
         if closing:
@@ -122,36 +186,89 @@ class TraderCore(object):
             )
         else:
             if closing:
-                res = self.__api.position.close(**f_args)
+                res = self._call_api(self.__api.position.close, **f_args)
             else:
-                res = self.__api.order.create(**f_args)
+                res = self._call_api(self.__api.order.create, **f_args)
             log_response(res, logger=self.__logger)
             if not (100 <= res.status <= 399):
                 raise APIResponseError(
                     'unexpected response:' + os.linesep + pformat(res.body)
                 )
-            elif self.__order_log_path:
+            self.__expected_txn_id = max(
+                self.__expected_txn_id,
+                int(res.body.get('lastTransactionID') or 0)
+            )
+            if self.__order_log_path:
                 self._write_data(res.raw_body, path=self.__order_log_path)
             else:
-                time.sleep(0.5)
+                self.sleep(0.5)
 
     def refresh_oanda_dicts(self):
-        t0 = datetime.now()
-        self._refresh_account_dicts()
-        self._sleep(last=t0, sec=0.5)
-        self._refresh_txn_list()
-        self._sleep(last=t0, sec=1)
-        self._refresh_inst_dict()
-        self._sleep(last=t0, sec=1.5)
-        self._refresh_price_dict()
+        if (self.__inst_dict
+                and (self.now() - self.__inst_refresh_time).total_seconds()
+                < self.__inst_ttl_sec):
+            self.metrics.count('cache_hits_total', cache='instrument')
+            self.run_concurrently(
+                *self._account_refreshers(), self._refresh_price_dict
+            )
+        elif self.__inst_dict:
+            self.metrics.count('cache_misses_total', cache='instrument')
+            self.run_concurrently(
+                *self._account_refreshers(), self._refresh_inst_dict,
+                self._refresh_price_dict
+            )
+        else:
+            self.run_concurrently(
+                *self._account_refreshers(), self._refresh_inst_dict
+            )
+            self._refresh_price_dict()
         self._refresh_unit_costs()
 
+    def _call_api(self, func, **kwargs):
+        if self.__token_bucket:
+            self.__token_bucket.acquire()
+        if not self.metrics.enabled:
+            return func(**kwargs)
+        else:
+            endpoint = '{0}.{1}'.format(
+                func.__module__.split('.')[-1], func.__name__
+            )
+            t0 = time.perf_counter()
+            res = func(**kwargs)
+            self.metrics.observe(
+                'api_seconds', time.perf_counter() - t0, endpoint=endpoint
+            )
+            self.metrics.count(
+                'api_calls_total', endpoint=endpoint, status=res.status
+            )
+            self.metrics.count(
+                'api_response_bytes_total', len(res.raw_body or ''),
+                endpoint=endpoint
+            )
+            return res
+
+    def now(self):
+        return pd.Timestamp.now(tz='UTC')
+
+    def sleep(self, secs):
+        time.sleep(secs)
+
+    def run_concurrently(self, *funcs):
+        if self.__executor:
+            futures = [self.__executor.submit(f) for f in funcs]
+            return [f.result() for f in futures]
+        else:
+            return [f() for f in funcs]
+
     def _refresh_txn_list(self):
         res = (
-            self.__api.transaction.since(
-                accountID=self.__account_id, id=self.__last_txn_id
+            self._call_api(
+                self.__api.transaction.since, accountID=self.__account_id,
+                id=self.__last_txn_id
             ) if self.__last_txn_id
-            else self.__api.transaction.list(accountID=self.__account_id)
+            else self._call_api(
+                self.__api.transaction.list, accountID=self.__account_id
+            )
         )
         # log_response(res, logger=self.__logger)
         if 'lastTransactionID' in res.body:
@@ -161,27 +278,99 @@ class TraderCore(object):
                 'unexpected response:' + os.linesep + pformat(res.body)
             )
         if res.body.get('transactions'):
-            t_new = [t.dict() for t in res.body['transactions']]
-            self.print_log(yaml.dump(t_new, default_flow_style=False).strip())
-            self.txn_list = self.txn_list + t_new
-            if self.__txn_log_path:
-                self._write_data(json.dumps(t_new), path=self.__txn_log_path)
+            self._add_txns([t.dict() for t in res.body['transactions']])
+
+    def _add_txns(self, txns):
+        self.print_log(yaml.dump(txns, default_flow_style=False).strip())
+        self.txn_index.add(txns)
+        self.__bs.update(txns)
+
+    def _account_refreshers(self):
+        # apply streamed transactions and return REST calls still needed
+        if not self.__txn_stream:
+            return [self._refresh_account_dicts, self._refresh_txn_list]
+        elif not self.__txn_stream.started:
+            self.__txn_stream.start()
+            return [self._refresh_account_dicts, self._refresh_txn_list]
+        else:
+            if self.__expected_txn_id > int(self.__last_txn_id or 0):
+                # wait for the fills of placed orders
+                self.__txn_stream.wait_for_id(
+                    txn_id=self.__expected_txn_id, timeout=1
+                )
+            self._apply_txns(self.__txn_stream.drain())
+            self.__expected_txn_id = max(
+                self.__expected_txn_id, self.__txn_stream.heartbeat_txn_id
+            )
+            if (not self.__txn_stream.is_fresh
+                    or self.__reconcile_time is None
+                    or (self.__txn_stream.connections
+                        != self.__reconciled_connections)
+                    or (time.monotonic() - self.__reconcile_time
+                        >= self.__reconcile_sec)
+                    or self.__expected_txn_id > int(self.__last_txn_id or 0)):
+                self.metrics.count('account_reconciliations_total')
+                return [self._refresh_account_dicts, self._refresh_txn_list]
+            else:
+                return list()
+
+    def _apply_txns(self, txns):
+        # event-sourced updates until the next account snapshot
+        last_txn_id = int(self.__last_txn_id or 0)
+        t_new = [t for t in txns if int(t['id']) > last_txn_id]
+        if t_new:
+            self.__last_txn_id = t_new[-1]['id']
+            self._add_txns(t_new)
+        for t in txns:
+            if int(t['id']) > self.__account_txn_id:
+                self._apply_txn_to_account(txn=t)
+                self.__account_txn_id = int(t['id'])
+
+    def _apply_txn_to_account(self, txn):
+        if txn.get('accountBalance') is not None:
+            balance = float(txn['accountBalance'])
+            if self.balance is not None and self.margin_avail is not None:
+                self.margin_avail = max(
+                    self.margin_avail + balance - self.balance, 0
+                )
+            self.balance = balance
+        if txn['type'] == 'ORDER_FILL' and txn.get('instrument'):
+            i = txn['instrument']
+            pos = self.pos_dict.get(i)
+            units0 = (pos['units'] if pos else 0)
+            units = units0 + int(float(txn.get('units') or 0))
+            if self.margin_avail is not None and i in self.unit_costs:
+                # unrealized PL is left to the next reconciliation
+                self.margin_avail = max(
+                    self.margin_avail
+                    - (abs(units) - abs(units0)) * self.unit_costs[i], 0
+                )
+            if units:
+                self.pos_dict[i] = {
+                    'side': ('long' if units > 0 else 'short'),
+                    'units': units, 'dt': self.now()
+                }
+            else:
+                self.pos_dict.pop(i, None)
 
     def _refresh_inst_dict(self):
-        res = self.__api.account.instruments(accountID=self.__account_id)
+        res = self._call_api(
+            self.__api.account.instruments, accountID=self.__account_id
+        )
         # log_response(res, logger=self.__logger)
         if 'instruments' in res.body:
             self.__inst_dict = {
                 c.name: vars(c) for c in res.body['instruments']
             }
+            self.__inst_refresh_time = self.now()
         else:
             raise APIResponseError(
                 'unexpected response:' + os.linesep + pformat(res.body)
             )
 
     def _refresh_price_dict(self):
-        res = self.__api.pricing.get(
-            accountID=self.__account_id,
+        res = self._call_api(
+            self.__api.pricing.get, accountID=self.__account_id,
             instruments=','.join(self.__inst_dict.keys())
         )
         # log_response(res, logger=self.__logger)
@@ -197,6 +386,17 @@ class TraderCore(object):
                 'unexpected response:' + os.linesep + pformat(res.body)
             )
 
+    def quote_instruments(self):
+        # instruments priced for orders and home-currency conversions
+        currencies = {c for i in self.instruments for c in i.split('_')}
+        return [
+            i for i in self.__inst_dict.keys()
+            if i in self.instruments or (
+                self.__account_currency in i.split('_')
+                and currencies.intersection(i.split('_'))
+            )
+        ]
+
     def _refresh_unit_costs(self):
         self.unit_costs = {
             i: self._calculate_bp_value(instrument=i) * float(e['marginRate'])
@@ -232,11 +432,22 @@ class TraderCore(object):
         return bpv
 
     def design_and_place_order(self, instrument, act):
+        with self.metrics.timer('order'):
+            if act and self.__order_lock:
+                with self.__order_lock:
+                    self._refresh_account_dicts()
+                    self._design_and_place_order(
+                        instrument=instrument, act=act
+                    )
+            else:
+                self._design_and_place_order(instrument=instrument, act=act)
+
+    def _design_and_place_order(self, instrument, act):
         pos = self.pos_dict.get(instrument)
         if pos and act and (act == 'closing' or act != pos['side']):
             self.__logger.info('Close a position:\t{}'.format(pos['side']))
             self._place_order(closing=True, instrument=instrument)
-            self._refresh_txn_list()
+            self.run_concurrently(*self._account_refreshers())
         if act in ['long', 'short']:
             limits = self._design_order_limits(instrument=instrument, side=act)
             self.__logger.debug(f'limits:\t{limits}')
@@ -249,6 +460,7 @@ class TraderCore(object):
                     'timeInForce': 'FOK', 'positionFill': 'DEFAULT', **limits
                 }
             )
+            self.run_concurrently(*self._account_refreshers())
 
     def _design_order_limits(self, instrument, side):
         ie = self.__inst_dict[instrument]
@@ -304,14 +516,8 @@ class TraderCore(object):
             if k in ['unit', 'init']
         }
         self.__logger.debug(f'sizes:\t{sizes}')
-        bet_size = self.__bs.calculate_size_by_pl(
-            unit_size=sizes['unit'],
-            inst_pl_txns=[
-                t for t in self.txn_list if (
-                    t.get('instrument') == instrument and t.get('pl') and
-                    t.get('units')
-                )
-            ],
+        bet_size = self.__bs.calculate_size(
+            instrument=instrument, unit_size=sizes['unit'],
             init_size=sizes['init']
         )
         self.__logger.debug(f'bet_size:\t{bet_size}')
@@ -320,12 +526,6 @@ class TraderCore(object):
             {'long': 1, 'short': -1}[side]
         )
 
-    @staticmethod
-    def _sleep(last, sec=0.5):
-        rest = sec - (datetime.now() - last).total_seconds()
-        if rest > 0:
-            time.sleep(rest)
-
     def print_log(self, data):
         if self.__quiet:
             self.__logger.info(data)
@@ -334,10 +534,7 @@ class TraderCore(object):
 
     def print_state_line(self, df_rate, add_str):
         i = df_rate['instrument'].iloc[-1]
-        net_pl = sum([
-            float(t['pl']) for t in self.txn_list
-            if t.get('instrument') == i and t.get('pl')
-        ])
+        net_pl = self.txn_index.net_pl(instrument=i)
         self.print_log(
             '|{0:^11}|{1:^29}|{2:^15}|'.format(
                 i,
@@ -357,13 +554,14 @@ class TraderCore(object):
             f.write(str(data) + (os.linesep if append_linesep else ''))
 
     def write_turn_log(self, df_rate, **kwargs):
-        i = df_rate['instrument'].iloc[-1]
-        df_r = df_rate.drop(columns=['instrument'])
-        self._write_log_df(name=f'rate.{i}', df=df_r)
-        if kwargs:
-            self._write_log_df(
-                name=f'sig.{i}', df=df_r.tail(n=1).assign(**kwargs)
-            )
+        if self.__log_dir_path:
+            i = df_rate['instrument'].iloc[-1]
+            df_r = df_rate.drop(columns=['instrument'])
+            self._write_log_df(name=f'rate.{i}', df=df_r)
+            if kwargs:
+                self._write_log_df(
+                    name=f'sig.{i}', df=df_r.tail(n=1).assign(**kwargs)
+                )
 
     def _write_log_df(self, name, df):
         if self.__log_dir_path and df.size:
@@ -378,29 +576,41 @@ class TraderCore(object):
             header=(not Path(path).is_file())
         )
 
-    def fetch_candle_df(self, instrument, granularity='S5', count=5000):
-        res = self.__api.instrument.candles(
-            instrument=instrument, price='BA', granularity=granularity,
-            count=int(count)
+    def fetch_candle_df(self, instrument, granularity='S5', count=5000,
+                        from_time=None):
+        res = self._call_api(
+            self.__api.instrument.candles, instrument=instrument,
+            price='BA', granularity=granularity, count=int(count),
+            **({'fromTime': from_time} if from_time else dict())
         )
         # log_response(res, logger=self.__logger)
         if 'candles' in res.body:
-            return pd.DataFrame([
+            candles = [c for c in res.body['candles'] if c.complete]
+            return pd.DataFrame(
                 {
-                    'time': c.time, 'bid': c.bid.c, 'ask': c.ask.c,
-                    'volume': c.volume
-                } for c in res.body['candles'] if c.complete
-            ]).assign(
-                time=lambda d: pd.to_datetime(d['time']), instrument=instrument
-            ).set_index('time', drop=True)
+                    'bid': np.array([c.bid.c for c in candles], dtype=float),
+                    'ask': np.array([c.ask.c for c in candles], dtype=float),
+                    'volume': np.array(
+                        [c.volume for c in candles], dtype=int
+                    ),
+                    'instrument': instrument
+                },
+                index=pd.DatetimeIndex(
+                    parse_rfc3339_ns(strs=[c.time for c in candles]).view(
+                        'datetime64[ns]'
+                    ),
+                    name='time'
+                ).tz_localize('UTC')
+            )
         else:
             raise APIResponseError(
                 'unexpected response:' + os.linesep + pformat(res.body)
             )
 
     def fetch_latest_price_df(self, instrument):
-        res = self.__api.pricing.get(
-            accountID=self.__account_id, instruments=instrument
+        res = self._call_api(
+            self.__api.pricing.get, accountID=self.__account_id,
+            instruments=instrument
         )
         # log_response(res, logger=self.__logger)
         if 'prices' in res.body:
@@ -429,7 +639,13 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         self.__granularities = [
             a for a in self.cf['feature']['granularities'] if a != 'TICK'
         ]
-        self.__cache_dfs = {i: pd.DataFrame() for i in self.instruments}
+        self.__tick_buffers = {
+            i: RingBuffer(
+                size=self.__n_cache, columns=['bid', 'ask', 'volume']
+            ) for i in self.instruments
+        }
+        self.__candle_dfs = dict()
+        self.__candle_due_times = dict()
         if model == 'ewma':
             self.__ai = Ewma(config_dict=self.cf)
         elif model == 'kalman':
@@ -437,6 +653,7 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         else:
             raise ValueError(f'invalid model name:\t{model}')
         self.__volatility_states = dict()
+        self.__volatility_trackers = dict()
         self.__granularity_lock = dict()
 
     def invoke(self):
@@ -444,53 +661,69 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         signal.signal(signal.SIGINT, signal.SIG_DFL)
         while self.check_health():
             try:
-                self._update_volatility_states()
-                for i in self.instruments:
-                    self.refresh_oanda_dicts()
-                    self.make_decision(instrument=i)
+                instruments = self.select_instruments()
+                if instruments:
+                    with self.metrics.timer('volatility'):
+                        self._update_volatility_states()
+                    with self.metrics.timer('refresh'):
+                        self.refresh_oanda_dicts()
+                    for i in instruments:
+                        with self.metrics.timer('decision'):
+                            self.make_decision(instrument=i)
             except (V20ConnectionError, V20Timeout, APIResponseError) as e:
                 if self.__ignore_api_error:
                     self.__logger.error(e)
                 else:
                     raise e
+            finally:
+                self.metrics.flush()
+        self.metrics.flush(force=True)
 
     @abstractmethod
     def check_health(self):
         return True
 
+    def select_instruments(self):
+        return self.instruments
+
     def _update_volatility_states(self):
         if not self.cf['volatility']['sleeping']:
             self.__volatility_states = {i: True for i in self.instruments}
         else:
-            self.__volatility_states = {
-                i: self.fetch_candle_df(
-                    instrument=i,
-                    granularity=self.cf['volatility']['granularity'],
-                    count=self.cf['volatility']['cache']
-                ).pipe(
-                    lambda d: (
-                        np.log(d[['ask', 'bid']].mean(axis=1)).diff().rolling(
-                            window=int(self.cf['volatility']['window'])
-                        ).std(ddof=0) * d['volume']
-                    )
-                ).dropna().pipe(
-                    lambda v: (
-                        v.iloc[-1]
-                        > v.quantile(self.cf['volatility']['sleeping'])
+            # candles come from the shared candle cache (only new bars)
+            g = self.cf['volatility']['granularity']
+            n = int(self.cf['volatility']['cache'])
+            for i in set(self.instruments):
+                tracker = self.__volatility_trackers.get(i)
+                if not tracker:
+                    tracker = VolatilityTracker(
+                        window=self.cf['volatility']['window'], size=n,
+                        quantile=self.cf['volatility']['sleeping']
                     )
-                ) for i in set(self.instruments)
-            }
+                    self.__volatility_trackers[i] = tracker
+                self.__volatility_states[i] = tracker.update(
+                    df_candle=self._update_candle_df(
+                        instrument=i, granularity=g,
+                        count=(
+                            max(n, self.__n_cache)
+                            if g in self.__granularities else n
+                        )
+                    ).tail(n=n)
+                ).is_active
 
     @abstractmethod
     def make_decision(self, instrument):
         pass
 
     def update_caches(self, df_rate):
-        self.__logger.info(f'Rate:{os.linesep}{df_rate}')
+        self.__logger.info('Rate:%s%s', os.linesep, df_rate)
         i = df_rate['instrument'].iloc[-1]
-        df_c = self.__cache_dfs[i].append(df_rate).tail(n=self.__n_cache)
-        self.__logger.info('Cache length:\t{}'.format(len(df_c)))
-        self.__cache_dfs[i] = df_c
+        buf = self.__tick_buffers[i].append(
+            time=df_rate.index.values.astype('datetime64[ns]').view(np.int64),
+            bid=df_rate['bid'].to_numpy(), ask=df_rate['ask'].to_numpy(),
+            volume=1
+        )
+        self.__logger.info('Cache length:\t{}'.format(len(buf)))
 
     def determine_sig_state(self, df_rate):
         i = df_rate['instrument'].iloc[-1]
@@ -500,36 +733,35 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
                 abs(pos['units'] * self.unit_costs[i] * 100 / self.balance), 1
             ) if pos else 0
         )
-        history_dict = self._fetch_history_dict(instrument=i)
+        with self.metrics.timer('candles'):
+            history_dict = self._fetch_history_dict(instrument=i)
         if not history_dict:
             sig = {
                 'sig_act': None, 'granularity': None, 'sig_log_str': (' ' * 40)
             }
         else:
             if self.cf['position']['side'] == 'auto':
-                inst_pls = [
-                    t['pl'] for t in self.txn_list
-                    if t.get('instrument') == i and t.get('pl')
-                ]
-                contrary = bool(inst_pls and float(inst_pls[-1]) < 0)
+                last_pl = self.txn_index.last_pl(instrument=i)
+                contrary = bool(last_pl is not None and last_pl < 0)
             else:
                 contrary = (self.cf['position']['side'] == 'contrarian')
-            sig = self.__ai.detect_signal(
-                history_dict=(
-                    {
-                        k: v for k, v in history_dict.items()
-                        if k == self.__granularity_lock[i]
-                    } if self.__granularity_lock.get(i) else history_dict
-                ),
-                pos=pos, contrary=contrary
-            )
+            with self.metrics.timer('model'):
+                sig = self.__ai.detect_signal(
+                    history_dict=(
+                        {
+                            k: v for k, v in history_dict.items()
+                            if k == self.__granularity_lock[i]
+                        } if self.__granularity_lock.get(i) else history_dict
+                    ),
+                    pos=pos, contrary=contrary, instrument=i
+                )
             if self.cf['feature']['granularity_lock']:
                 self.__granularity_lock[i] = (
                     sig['granularity']
                     if pos or sig['sig_act'] in {'long', 'short'} else None
                 )
             if pos and sig['sig_act'] and sig['sig_act'] == pos['side']:
-                self.pos_dict[i]['dt'] = datetime.now()
+                self.pos_dict[i]['dt'] = self.now()
         if not sig['granularity']:
             act = None
             state = 'LOADING'
@@ -543,7 +775,7 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
             act = 'closing'
             state = 'CLOSING'
         elif (pos and not sig['sig_act']
-              and ((datetime.now() - pos['dt']).total_seconds()
+              and ((self.now() - pos['dt']).total_seconds()
                    > self.cf['position']['ttl_sec'])):
             act = 'closing'
             state = 'POSITION EXPIRED'
@@ -587,21 +819,73 @@ class BaseTrader(TraderCore, metaclass=ABCMeta):
         }
 
     def _fetch_history_dict(self, instrument):
-        df_c = self.__cache_dfs[instrument]
+        buf = self.__tick_buffers[instrument]
         return {
             **(
-                {'TICK': df_c.assign(volume=1)}
-                if self.__use_tick and len(df_c) == self.__n_cache else dict()
+                {'TICK': buf.to_df()}
+                if self.__use_tick and len(buf) == self.__n_cache else dict()
             ),
-            **{
-                g: self.fetch_candle_df(
-                    instrument=instrument, granularity=g, count=self.__n_cache
-                ).rename(
-                    columns={'closeAsk': 'ask', 'closeBid': 'bid'}
-                )[['ask', 'bid', 'volume']] for g in self.__granularities
-            }
+            **dict(
+                zip(
+                    self.__granularities,
+                    self.run_concurrently(*[
+                        partial(
+                            self._update_candle_df, instrument=instrument,
+                            granularity=g, count=self.__n_cache
+                        ) for g in self.__granularities
+                    ])
+                )
+            )
         }
 
+    def _update_candle_df(self, instrument, granularity, count):
+        df_c = self.__candle_dfs.get((instrument, granularity))
+        due_time = self.__candle_due_times.get((instrument, granularity))
+        if due_time and self.now() < due_time:
+            self.metrics.count('cache_hits_total', cache='candle')
+            return df_c
+        self.metrics.count('cache_misses_total', cache='candle')
+        if df_c is None or df_c.empty:
+            df_c = self.fetch_candle_df(
+                instrument=instrument, granularity=granularity, count=count
+            )[['ask', 'bid', 'volume']]
+        else:
+            df_n = self.fetch_candle_df(
+                instrument=instrument, granularity=granularity, count=count,
+                from_time=df_c.index[-1].strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+            )
+            if len(df_n) >= count - 1:
+                self.__logger.debug(
+                    f'candle gap:\t{instrument}\t{granularity}'
+                )
+                df_c = self.fetch_candle_df(
+                    instrument=instrument, granularity=granularity,
+                    count=count
+                )[['ask', 'bid', 'volume']]
+            elif df_n.size and df_n.index[-1] > df_c.index[-1]:
+                # append new bars and drop the oldest on NumPy arrays
+                i_new = df_n.index.searchsorted(df_c.index[-1], side='right')
+                i_old = max(len(df_c) + len(df_n) - i_new - int(count), 0)
+                df_c = pd.DataFrame(
+                    {
+                        k: np.concatenate([
+                            df_c[k].to_numpy()[i_old:],
+                            df_n[k].to_numpy()[i_new:]
+                        ]) for k in df_c.columns
+                    },
+                    index=df_c.index[i_old:].append(df_n.index[i_new:])
+                )
+        self.__candle_dfs[(instrument, granularity)] = df_c
+        if df_c.size:
+            self.__candle_due_times[(instrument, granularity)] = (
+                df_c.index[-1]
+                + pd.Timedelta(seconds=(granularity2sec(granularity) * 2))
+            )
+        self.__logger.debug(
+            f'candle cache:\t{instrument}\t{granularity}\t{len(df_c)}'
+        )
+        return df_c
+
     def _is_margin_lack(self, instrument):
         return (
             not self.pos_dict.get(instrument) and
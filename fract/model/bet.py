@@ -21,6 +21,7 @@ class BettingSystem(object):
             self.__logger.info(f'Betting strategy:\t{self.strategy}')
         else:
             raise ValueError('invalid strategy name')
+        self.__states = dict()
 
     def calculate_size_by_pl(self, unit_size, inst_pl_txns, init_size=None):
         size_list = [
@@ -45,6 +46,60 @@ class BettingSystem(object):
                 all_time_high=(pl.cumsum().idxmax() == pl.index[-1])
             )
 
+    def update(self, txns):
+        # feed transactions and keep the betting state of each instrument
+        for t in txns:
+            if t.get('instrument') and t.get('pl') and t.get('units'):
+                self._update_state(
+                    instrument=t['instrument'], pl=float(t['pl']),
+                    units=float(t['units'])
+                )
+        return self
+
+    def rebuild(self, txns):
+        self.__states = dict()
+        return self.update(txns)
+
+    def _update_state(self, instrument, pl, units):
+        st = self.__states.get(instrument)
+        if not st:
+            st = {
+                'last_size': 0, 'last_pls': tuple(), 'cum_pl': 0.0,
+                'pl_hwm': float('-inf'), 'all_time_high': False
+            }
+            self.__states[instrument] = st
+        if units != 0:
+            st['last_size'] = abs(int(units))
+        if pl != 0:
+            st['last_pls'] = (*st['last_pls'][-1:], pl)
+            st['cum_pl'] += pl
+            st['all_time_high'] = (st['cum_pl'] > st['pl_hwm'])
+            st['pl_hwm'] = max(st['pl_hwm'], st['cum_pl'])
+
+    def state(self, instrument):
+        st = self.__states.get(instrument)
+        return (dict(st) if st else None)
+
+    def calculate_size(self, instrument, unit_size, init_size=None):
+        # same as calculate_size_by_pl with the transactions fed so far
+        st = self.__states.get(instrument)
+        last_size = (st['last_size'] if st else 0)
+        self.__logger.debug(f'last_size:\t{last_size}')
+        if not (st and st['last_pls']):
+            return last_size or init_size or unit_size
+        else:
+            pls = st['last_pls']
+            won_last = (
+                None if (len(pls) > 1 and pls[-1] > 0 and sum(pls) < 0)
+                else (pls[-1] > 0)
+            )
+            self.__logger.debug(f'won_last:\t{won_last}')
+            return self._calculate_size(
+                unit_size=unit_size, init_size=init_size,
+                last_size=last_size, won_last=won_last,
+                all_time_high=st['all_time_high']
+            )
+
     def _calculate_size(self, unit_size, init_size=None, last_size=None,
                         won_last=None, all_time_high=False):
         if won_last is None:
@@ -0,0 +1,695 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import re
+import threading
+
+import numpy as np
+from v20 import Context
+from v20.response import Response
+
+from ..util.granularity import granularity2sec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class SimulatedBroker(object):
+    def __init__(self, history_dfs, account_id, balance=1000000,
+                 currency='USD', margin_rate=0.04, start=None):
+        self.__logger = logging.getLogger(__name__)
+        self.account_id = account_id
+        self.currency = currency
+        self.__margin_rate = float(margin_rate)
+        self.__arrays = {
+            i: self._convert_rate_df(df=d) for i, d in history_dfs.items()
+        }
+        self.instruments = sorted(self.__arrays.keys())
+        self.now = int(
+            start if start is not None
+            else min(a['avail'][0] for a in self.__arrays.values())
+        )
+        for i in self.instruments:
+            self._quote_home_rate(instrument=i)
+        self.__balance = float(balance)
+        self.__init_balance = float(balance)
+        self.__trades = {i: list() for i in self.instruments}
+        self.__txns = list()
+        self.__closed_pls = list()
+        self.__balance_hwm = float(balance)
+        self.__max_drawdown = 0.0
+        self.__candles = dict()
+        self.__lock = threading.RLock()
+        self.__routes = [
+            ('GET', re.compile(r'^/v3/accounts/([^/]+)$'), self._get_account),
+            (
+                'GET', re.compile(r'^/v3/accounts/([^/]+)/instruments$'),
+                self._get_instruments
+            ),
+            (
+                'GET', re.compile(r'^/v3/accounts/([^/]+)/transactions$'),
+                self._list_transactions
+            ),
+            (
+                'GET',
+                re.compile(r'^/v3/accounts/([^/]+)/transactions/sinceid$'),
+                self._get_transactions_since
+            ),
+            (
+                'GET', re.compile(r'^/v3/accounts/([^/]+)/pricing$'),
+                self._get_pricing
+            ),
+            (
+                'GET', re.compile(r'^/v3/instruments/([^/]+)/candles$'),
+                self._get_candles
+            ),
+            (
+                'POST', re.compile(r'^/v3/accounts/([^/]+)/orders$'),
+                self._create_order
+            ),
+            (
+                'PUT',
+                re.compile(r'^/v3/accounts/([^/]+)/positions/([^/]+)/close$'),
+                self._close_position
+            )
+        ]
+
+    @property
+    def has_ticks(self):
+        return all(a['bar_ns'] == 0 for a in self.__arrays.values())
+
+    @staticmethod
+    def _convert_rate_df(df):
+        time = df.index.values.astype('datetime64[ns]').view(np.int64)
+        bar_ns = (
+            int(np.diff(time)[np.diff(time) > 0].min())
+            if 'bid_high' in df.columns and time.size > 1 else 0
+        )
+        return {
+            'time': time, 'avail': time + bar_ns, 'bar_ns': bar_ns,
+            **{
+                k: df[k].to_numpy(dtype=np.float64)
+                for k in ['bid', 'ask', 'volume']
+            },
+            **{
+                f'{k}_{t}': df[
+                    f'{k}_{t}' if f'{k}_{t}' in df.columns else k
+                ].to_numpy(dtype=np.float64)
+                for k in ['bid', 'ask'] for t in ['high', 'low']
+            }
+        }
+
+    def handle(self, method, path, params=None, body=None):
+        for m, pattern, func in self.__routes:
+            matched = pattern.match(path)
+            if matched and m == method:
+                with self.__lock:
+                    if (path.startswith('/v3/accounts/')
+                            and matched.group(1) != self.account_id):
+                        return 400, {
+                            'errorMessage': 'Invalid value specified for '
+                            + "'accountID'"
+                        }
+                    else:
+                        return func(
+                            *matched.groups()[
+                                int(path.startswith('/v3/accounts/')):
+                            ],
+                            params=(params or dict()), body=(body or dict())
+                        )
+        return 404, {'errorMessage': f'Not found:\t{method} {path}'}
+
+    def next_time(self, step_sec=60):
+        step_ns = int(step_sec * 1e9)
+        next_avails = [
+            a['avail'][i] for i, a in [
+                (np.searchsorted(a['avail'], self.now, side='right'), a)
+                for a in self.__arrays.values()
+            ] if i < a['avail'].size
+        ]
+        if next_avails:
+            return int(-(-min(next_avails) // step_ns) * step_ns)
+        else:
+            return None
+
+    def rate_slice(self, instrument, since=None):
+        a = self.__arrays[instrument]
+        return slice(
+            (
+                int(np.searchsorted(a['avail'], since, side='right'))
+                if since is not None else 0
+            ),
+            int(np.searchsorted(a['avail'], self.now, side='right'))
+        )
+
+    def rate_arrays(self, instrument, since=None):
+        a = self.__arrays[instrument]
+        s = self.rate_slice(instrument=instrument, since=since)
+        return {k: a[k][s] for k in ['avail', 'bid', 'ask']}
+
+    def advance(self, time):
+        with self.__lock:
+            for i, trades in self.__trades.items():
+                if trades:
+                    a = self.__arrays[i]
+                    s = slice(
+                        int(np.searchsorted(a['avail'], self.now, 'right')),
+                        int(np.searchsorted(a['avail'], time, 'right'))
+                    )
+                    if s.start < s.stop:
+                        for t in list(trades):
+                            self._check_exit(instrument=i, trade=t, s=s)
+            self.now = int(time)
+
+    def _check_exit(self, instrument, trade, s):
+        a = self.__arrays[instrument]
+        is_long = (trade['units'] > 0)
+        high = a[('bid' if is_long else 'ask') + '_high'][s]
+        low = a[('bid' if is_long else 'ask') + '_low'][s]
+        sign = (1 if is_long else -1)
+        hits = list()
+        if trade['sl'] is not None:
+            hit = (low <= trade['sl'] if is_long else high >= trade['sl'])
+            if hit.any():
+                k = int(hit.argmax())
+                hits.append((
+                    k, 0, 'STOP_LOSS_ORDER',
+                    (min if is_long else max)(
+                        trade['sl'], (high if is_long else low)[k]
+                    )
+                ))
+        if trade['ts'] is not None:
+            peaks = (np.maximum if is_long else np.minimum).accumulate(
+                np.concatenate([[trade['peak']], (high if is_long else low)])
+            )
+            stops = peaks[:-1] - sign * trade['ts']
+            hit = (low <= stops if is_long else high >= stops)
+            if hit.any():
+                k = int(hit.argmax())
+                hits.append((
+                    k, 1, 'TRAILING_STOP_LOSS_ORDER',
+                    (min if is_long else max)(
+                        stops[k], (high if is_long else low)[k]
+                    )
+                ))
+            else:
+                trade['peak'] = float(peaks[-1])
+        if trade['tp'] is not None:
+            hit = (high >= trade['tp'] if is_long else low <= trade['tp'])
+            if hit.any():
+                hits.append((int(hit.argmax()), 2, 'TAKE_PROFIT_ORDER',
+                             trade['tp']))
+        if hits:
+            k, _, reason, price = min(hits)
+            self._close_trade(
+                instrument=instrument, trade=trade, price=float(price),
+                reason=reason, time=int(a['avail'][s][k])
+            )
+
+    def _price(self, instrument):
+        a = self.__arrays[instrument]
+        k = max(int(np.searchsorted(a['avail'], self.now, 'right')) - 1, 0)
+        return {'bid': float(a['bid'][k]), 'ask': float(a['ask'][k])}
+
+    def _quote_home_rate(self, instrument):
+        base, quote = instrument.split('_')
+        if quote == self.currency:
+            return 1.0
+        elif base == self.currency:
+            p = self._price(instrument=instrument)
+            return 2 / (p['bid'] + p['ask'])
+        elif f'{quote}_{self.currency}' in self.__arrays:
+            p = self._price(instrument=f'{quote}_{self.currency}')
+            return (p['bid'] + p['ask']) / 2
+        elif f'{self.currency}_{quote}' in self.__arrays:
+            p = self._price(instrument=f'{self.currency}_{quote}')
+            return 2 / (p['bid'] + p['ask'])
+        else:
+            raise ValueError(
+                f'rate history for {quote}/{self.currency} required:\t'
+                + instrument
+            )
+
+    def _unrealized_pl(self, instrument, trade):
+        p = self._price(instrument=instrument)
+        return (
+            trade['units']
+            * (p['bid' if trade['units'] > 0 else 'ask'] - trade['price'])
+            * self._quote_home_rate(instrument=instrument)
+        )
+
+    def _margin_used(self, instrument=None, units=0):
+        return sum(
+            abs(u) * (p['bid'] + p['ask']) / 2 * self.__margin_rate
+            * self._quote_home_rate(instrument=i)
+            for i, u, p in [
+                (
+                    i, sum(t['units'] for t in trades)
+                    + (units if i == instrument else 0),
+                    self._price(instrument=i)
+                ) for i, trades in self.__trades.items()
+            ] if u
+        )
+
+    def _nav(self):
+        return self.__balance + sum(
+            self._unrealized_pl(instrument=i, trade=t)
+            for i, trades in self.__trades.items() for t in trades
+        )
+
+    def _add_txn(self, type, time=None, **kwargs):
+        txn = {
+            'id': str(len(self.__txns) + 1),
+            'time': self._format_time(time if time is not None else self.now),
+            'accountID': self.account_id, 'type': type, **kwargs
+        }
+        self.__txns.append(txn)
+        return txn
+
+    @staticmethod
+    def _format_time(time):
+        return str(np.datetime64(int(time), 'ns')) + 'Z'
+
+    def _open_trade(self, instrument, units, order_id, order):
+        p = self._price(instrument=instrument)
+        price = p['ask' if units > 0 else 'bid']
+        txn = self._add_txn(
+            type='ORDER_FILL', orderID=order_id, instrument=instrument,
+            units=str(units), price=price, pl='0.0', financing='0.0',
+            commission='0.0', accountBalance=str(self.__balance),
+            reason='MARKET_ORDER'
+        )
+        txn['tradeOpened'] = {'tradeID': txn['id'], 'units': str(units)}
+        self.__trades[instrument].append({
+            'id': txn['id'], 'units': units, 'price': price,
+            'tp': (
+                float(order['takeProfitOnFill']['price'])
+                if order.get('takeProfitOnFill') else None
+            ),
+            'sl': (
+                float(order['stopLossOnFill']['price'])
+                if order.get('stopLossOnFill') else None
+            ),
+            'ts': (
+                float(order['trailingStopLossOnFill']['distance'])
+                if order.get('trailingStopLossOnFill') else None
+            ),
+            'peak': p['bid' if units > 0 else 'ask']
+        })
+        return txn
+
+    def _close_trade(self, instrument, trade, price, reason, time=None,
+                     order_id=None, units=None):
+        # units: part of the trade units to close (default: all)
+        closed = (trade['units'] if units is None else units)
+        pl = (
+            closed * (price - trade['price'])
+            * self._quote_home_rate(instrument=instrument)
+        )
+        self.__balance += pl
+        is_closed = (closed == trade['units'])
+        if is_closed:
+            self.__trades[instrument].remove(trade)
+        else:
+            trade['units'] -= closed
+        self.__closed_pls.append(pl)
+        self.__balance_hwm = max(self.__balance_hwm, self.__balance)
+        self.__max_drawdown = max(
+            self.__max_drawdown, self.__balance_hwm - self.__balance
+        )
+        trade_close = {
+            'tradeID': trade['id'], 'units': str(-closed), 'price': price,
+            'realizedPL': str(pl)
+        }
+        txn = self._add_txn(
+            type='ORDER_FILL', time=time,
+            orderID=(order_id or str(len(self.__txns) + 1)),
+            instrument=instrument, units=str(-closed), price=price,
+            pl=str(pl), financing='0.0', commission='0.0',
+            accountBalance=str(self.__balance), reason=reason,
+            **(
+                {'tradesClosed': [trade_close]} if is_closed
+                else {'tradeReduced': trade_close}
+            )
+        )
+        self.__logger.debug(f'closed:\t{instrument}\t{reason}\t{pl}')
+        return txn
+
+    def _get_account(self, params, body):
+        nav = self._nav()
+        margin_used = self._margin_used()
+        return 200, {
+            'account': {
+                'id': self.account_id, 'currency': self.currency,
+                'balance': str(self.__balance), 'NAV': str(nav),
+                'unrealizedPL': str(nav - self.__balance),
+                'marginUsed': str(margin_used),
+                'marginAvailable': str(max(nav - margin_used, 0)),
+                'openTradeCount': sum(len(v) for v in self.__trades.values()),
+                'positions': [
+                    {
+                        'instrument': i,
+                        **{
+                            k: {
+                                'units': str(sum(t['units'] for t in v)),
+                                'tradeIDs': [t['id'] for t in v],
+                                **(
+                                    {
+                                        'averagePrice': str(
+                                            sum(
+                                                t['price'] * t['units']
+                                                for t in v
+                                            ) / sum(t['units'] for t in v)
+                                        )
+                                    } if v else dict()
+                                )
+                            } for k, v in [
+                                (
+                                    'long',
+                                    [t for t in trades if t['units'] > 0]
+                                ),
+                                (
+                                    'short',
+                                    [t for t in trades if t['units'] < 0]
+                                )
+                            ]
+                        }
+                    } for i, trades in self.__trades.items() if trades
+                ],
+                'lastTransactionID': str(len(self.__txns))
+            },
+            'lastTransactionID': str(len(self.__txns))
+        }
+
+    def _get_instruments(self, params, body):
+        return 200, {
+            'instruments': [
+                {
+                    'name': i, 'type': 'CURRENCY',
+                    'displayName': i.replace('_', '/'),
+                    'pipLocation': pip, 'displayPrecision': (1 - pip),
+                    'tradeUnitsPrecision': 0, 'minimumTradeSize': '1',
+                    'minimumTrailingStopDistance': str(5 * 10 ** pip),
+                    'maximumTrailingStopDistance': str(10000 * 10 ** pip),
+                    'maximumPositionSize': '0',
+                    'maximumOrderUnits': '100000000',
+                    'marginRate': str(self.__margin_rate)
+                } for i, pip in [
+                    (i, (-2 if i.endswith('_JPY') else -4))
+                    for i in self.instruments
+                ]
+            ],
+            'lastTransactionID': str(len(self.__txns))
+        }
+
+    def _list_transactions(self, params, body):
+        return 200, {
+            'count': len(self.__txns), 'pageSize': 100, 'pages': list(),
+            'lastTransactionID': str(len(self.__txns))
+        }
+
+    def _get_transactions_since(self, params, body):
+        return 200, {
+            'transactions': self.__txns[int(params.get('id', 0)):],
+            'lastTransactionID': str(len(self.__txns))
+        }
+
+    def _get_pricing(self, params, body):
+        return 200, {
+            'prices': [
+                {
+                    'type': 'PRICE', 'instrument': i,
+                    'time': self._format_time(
+                        self.__arrays[i]['avail'][max(s.stop - 1, 0)]
+                    ),
+                    'tradeable': True,
+                    'bids': [{'price': p['bid'], 'liquidity': 10000000}],
+                    'asks': [{'price': p['ask'], 'liquidity': 10000000}],
+                    'closeoutBid': p['bid'], 'closeoutAsk': p['ask']
+                } for i, s, p in [
+                    (
+                        i, self.rate_slice(instrument=i),
+                        self._price(instrument=i)
+                    ) for i in params.get('instruments', '').split(',')
+                    if i in self.__arrays
+                ]
+            ]
+        }
+
+    def _get_candles(self, instrument, params, body):
+        if instrument not in self.__arrays:
+            return 400, {'errorMessage': f'Invalid instrument:\t{instrument}'}
+        granularity = params.get('granularity', 'S5')
+        c = self._candle_arrays(instrument=instrument, granularity=granularity)
+        begin, end = self._candle_range(
+            c=c, granularity=granularity, count=params.get('count', 500),
+            from_time=params.get('from')
+        )
+        return 200, {
+            'instrument': instrument, 'granularity': granularity,
+            'candles': [
+                {
+                    'time': t, 'volume': int(v), 'complete': True,
+                    'bid': {'o': bo, 'h': bh, 'l': bl, 'c': bc},
+                    'ask': {'o': ao, 'h': ah, 'l': al, 'c': ac}
+                } for t, v, bo, bh, bl, bc, ao, ah, al, ac in zip(
+                    *[
+                        (
+                            c[k][begin:end].tolist() if k != 'time'
+                            else c[k][begin:end]
+                        ) for k in [
+                            'time', 'volume', 'bid_o', 'bid_h', 'bid_l',
+                            'bid_c', 'ask_o', 'ask_h', 'ask_l', 'ask_c'
+                        ]
+                    ]
+                )
+            ]
+        }
+
+    def _complete_candle_end(self, c, granularity):
+        return min(
+            int(
+                np.searchsorted(
+                    c['start'],
+                    self.now - granularity2sec(granularity) * 10**9, 'right'
+                )
+            ),
+            int(np.searchsorted(c['avail'], self.now, 'right'))
+        )
+
+    def _candle_range(self, c, granularity, count=500, from_time=None):
+        end = self._complete_candle_end(c=c, granularity=granularity)
+        if from_time:
+            begin = int(
+                np.searchsorted(
+                    c['start'], self._parse_time(from_time), 'left'
+                )
+            )
+            return begin, min(end, begin + int(count))
+        else:
+            return max(end - int(count), 0), end
+
+    def candle_arrays(self, instrument, granularity, count=500,
+                      from_time=None):
+        # complete candles as arrays (bypassing the API)
+        c = self._candle_arrays(instrument=instrument, granularity=granularity)
+        s = slice(
+            *self._candle_range(
+                c=c, granularity=granularity, count=count, from_time=from_time
+            )
+        )
+        return {k: c[k][s] for k in ['start', 'volume', 'bid_c', 'ask_c']}
+
+    @staticmethod
+    def _parse_time(time_str):
+        return int(
+            np.datetime64(time_str.rstrip('Z'), 'ns').astype(np.int64)
+        )
+
+    def _candle_arrays(self, instrument, granularity):
+        key = (instrument, granularity)
+        if key not in self.__candles:
+            a = self.__arrays[instrument]
+            g_ns = granularity2sec(granularity) * 10**9
+            start, i_first = np.unique(
+                a['time'] // g_ns * g_ns, return_index=True
+            )
+            i_last = np.append(i_first[1:], a['time'].size) - 1
+            self.__candles[key] = {
+                'start': start, 'avail': a['avail'][i_last],
+                'time': np.char.add(
+                    np.datetime_as_string(
+                        start.view('datetime64[ns]'), unit='ns'
+                    ),
+                    'Z'
+                ).tolist(),
+                'volume': np.add.reduceat(a['volume'], i_first),
+                **{
+                    f'{k}_o': a[k][i_first] for k in ['bid', 'ask']
+                },
+                **{
+                    f'{k}_c': a[k][i_last] for k in ['bid', 'ask']
+                },
+                **{
+                    f'{k}_h': np.maximum.reduceat(a[f'{k}_high'], i_first)
+                    for k in ['bid', 'ask']
+                },
+                **{
+                    f'{k}_l': np.minimum.reduceat(a[f'{k}_low'], i_first)
+                    for k in ['bid', 'ask']
+                }
+            }
+        return self.__candles[key]
+
+    def _create_order(self, params, body):
+        order = body.get('order', dict())
+        instrument = order.get('instrument')
+        if instrument not in self.__arrays or order.get('type') != 'MARKET':
+            return 400, {'errorMessage': f'Invalid order:\t{order}'}
+        units = int(float(order['units']))
+        order_txn = self._add_txn(
+            type='MARKET_ORDER', reason='CLIENT_ORDER',
+            **{k: v for k, v in order.items() if k != 'type'}
+        )
+        opposite = [
+            t for t in self.__trades[instrument] if t['units'] * units < 0
+        ]
+        if (self._margin_used(instrument=instrument, units=units)
+                > self._nav()):
+            return 201, {
+                'orderCreateTransaction': order_txn,
+                'orderCancelTransaction': self._add_txn(
+                    type='ORDER_CANCEL', orderID=order_txn['id'],
+                    reason='INSUFFICIENT_MARGIN'
+                ),
+                'lastTransactionID': str(len(self.__txns))
+            }
+        else:
+            # positionFill DEFAULT: reduce opposite trades (FIFO) first and
+            # open a trade with the remaining units
+            p = self._price(instrument=instrument)
+            remaining = units
+            for t in opposite:
+                closed = (
+                    t['units'] if abs(t['units']) <= abs(remaining)
+                    else -remaining
+                )
+                fill_txn = self._close_trade(
+                    instrument=instrument, trade=t,
+                    price=p['bid' if t['units'] > 0 else 'ask'],
+                    reason='MARKET_ORDER', order_id=order_txn['id'],
+                    units=closed
+                )
+                remaining += closed
+                if not remaining:
+                    break
+            if remaining:
+                fill_txn = self._open_trade(
+                    instrument=instrument, units=remaining,
+                    order_id=order_txn['id'], order=order
+                )
+            return 201, {
+                'orderCreateTransaction': order_txn,
+                'orderFillTransaction': fill_txn,
+                'lastTransactionID': str(len(self.__txns))
+            }
+
+    def _close_position(self, instrument, params, body):
+        if instrument not in self.__arrays:
+            return 400, {'errorMessage': f'Invalid instrument:\t{instrument}'}
+        p = self._price(instrument=instrument)
+        res = dict()
+        for side, sign in [('long', 1), ('short', -1)]:
+            trades = [
+                t for t in self.__trades[instrument] if t['units'] * sign > 0
+            ]
+            if body.get(f'{side}Units', 'NONE') != 'NONE' and trades:
+                order_txn = self._add_txn(
+                    type='MARKET_ORDER', instrument=instrument,
+                    units=str(-sum(t['units'] for t in trades)),
+                    timeInForce='FOK', positionFill='REDUCE_ONLY',
+                    reason='POSITION_CLOSEOUT'
+                )
+                res[f'{side}OrderCreateTransaction'] = order_txn
+                for t in trades:
+                    res[f'{side}OrderFillTransaction'] = self._close_trade(
+                        instrument=instrument, trade=t,
+                        price=p['bid' if sign > 0 else 'ask'],
+                        reason='MARKET_ORDER_POSITION_CLOSEOUT',
+                        order_id=order_txn['id']
+                    )
+        if res:
+            return 200, {**res, 'lastTransactionID': str(len(self.__txns))}
+        else:
+            return 400, {
+                'errorCode': 'CLOSEOUT_POSITION_DOESNT_EXIST',
+                'errorMessage': 'The Position requested to be closed out does'
+                + ' not exist'
+            }
+
+    def summary(self):
+        pls = np.array(self.__closed_pls)
+        return {
+            'start': self._format_time(
+                min(a['avail'][0] for a in self.__arrays.values())
+            ),
+            'end': self._format_time(self.now),
+            'currency': self.currency,
+            'initial_balance': self.__init_balance,
+            'balance': round(self.__balance, 6),
+            'nav': round(self._nav(), 6),
+            'pl': round(self.__balance - self.__init_balance, 6),
+            'closed_trades': int(pls.size),
+            'win_rate': (
+                round(float((pls > 0).mean()), 6) if pls.size else None
+            ),
+            'max_drawdown': round(self.__max_drawdown, 6),
+            'transactions': len(self.__txns)
+        }
+
+
+class SimulatedContext(Context):
+    def __init__(self, broker, **kwargs):
+        super().__init__(hostname='localhost', token='', **kwargs)
+        self.broker = broker
+
+    def request(self, request):
+        # responses without a content type skip the JSON parser of v20
+        status, body = self.broker.handle(
+            method=request.method, path=request.path, params=request.params,
+            body=(json.loads(request.body) if request.body else None)
+        )
+        response = Response(
+            request, request.method, request.path, status,
+            ('OK' if status < 400 else 'Error'), dict()
+        )
+        response.body = {
+            k: self._parse(key=k, value=v) for k, v in body.items()
+        }
+        if request.method != 'GET':
+            # the raw body of an order response is written to the order log
+            response.set_raw_body(
+                orjson.dumps(body).decode() if orjson else json.dumps(body)
+            )
+        return response
+
+    def _parse(self, key, value):
+        from_dict = (
+            self.transaction.Transaction.from_dict
+            if key == 'transactions' or key.endswith('Transaction')
+            else {
+                'account': self.account.Account.from_dict,
+                'instruments': self.primitives.Instrument.from_dict,
+                'prices': self.pricing.ClientPrice.from_dict,
+                'candles': self.instrument.Candlestick.from_dict
+            }.get(key)
+        )
+        if not from_dict:
+            return value
+        elif isinstance(value, list):
+            return [from_dict(d, self) for d in value]
+        else:
+            return from_dict(value, self)
@@ -4,6 +4,7 @@ import logging
 
 import numpy as np
 
+from ..util.ewm import RollingEwm
 from .sieve import LRFeatureSieve
 
 
@@ -13,12 +14,23 @@ class Ewma(object):
         self.__alpha = config_dict['model']['ewma']['alpha']
         self.__sigma_band = config_dict['model']['ewma']['sigma_band']
         self.__lrfs = LRFeatureSieve(
-            type=config_dict['feature']['type'], drop_zero=False
+            type=config_dict['feature']['type'], drop_zero=False,
+            use_statsmodels=config_dict['feature'].get(
+                'statsmodels_ljungbox', False
+            ),
+            workers=config_dict['feature'].get('workers', 1)
         )
+        self.__ewm_states = dict()
 
-    def detect_signal(self, history_dict, pos=None, contrary=False):
-        best_f = self.__lrfs.extract_best_feature(history_dict=history_dict)
-        sig_dict = self._ewm_stats(series=best_f['series'])
+    def detect_signal(self, history_dict, pos=None, contrary=False,
+                      instrument=None):
+        best_f = self.__lrfs.extract_best_feature(
+            history_dict=history_dict, instrument=instrument
+        )
+        sig_dict = self._ewm_stats(
+            series=best_f['unscaled_series'], scale=best_f['scale'],
+            key=(instrument, best_f['granularity'])
+        )
         sig_side = (
             'short' if sig_dict['ewma'] * [1, -1][int(contrary)] < 0
             else 'long'
@@ -44,11 +56,24 @@ class Ewma(object):
             'sig_ewmbbu': sig_dict['ewmbb'][1]
         }
 
-    def _ewm_stats(self, series):
-        ewm = series.ewm(alpha=self.__alpha)
-        ewma = ewm.mean().iloc[-1]
+    def _ewm_stats(self, series, scale=1, key=None):
+        # unscaled values keep the rolling sums comparable between turns
+        # (the mean and the std are proportional to the scale)
+        ewm = self.__ewm_states.get(key)
+        if (ewm and series.size
+                and series.index[0] <= ewm.last_time <= series.index[-1]):
+            i_new = series.index.searchsorted(ewm.last_time, side='right')
+            ewm.append(
+                times=series.index[i_new:], values=series.to_numpy()[i_new:]
+            ).evict(before=series.index[0])
+        else:
+            ewm = RollingEwm(alpha=self.__alpha).append(
+                times=series.index, values=series
+            )
+            self.__ewm_states[key] = ewm
+        ewma = ewm.mean * scale
         self.__logger.debug(f'ewma:\t{ewma}')
         ewm_bollinger_band = (
-            np.array([-1, 1]) * ewm.std().iloc[-1] * self.__sigma_band
+            np.array([-1, 1]) * ewm.std * scale * self.__sigma_band
         ) + ewma
         return {'ewma': ewma, 'ewmbb': ewm_bollinger_band}
@@ -3,6 +3,81 @@
 import logging
 
 import numpy as np
+import pandas as pd
+
+
+class LogReturnBuffer(object):
+    def __init__(self, capacity=5000):
+        self.__capacity = max(int(capacity), 1) * 2
+        self.__start = 0
+        self.__end = 0
+        self.__arrays = {
+            'time': np.empty(self.__capacity, dtype=np.int64),
+            **{
+                k: np.empty(self.__capacity, dtype=np.float64) for k in [
+                    'log_mid', 'inv_spread', 'volume', 'log_diff',
+                    'delta_sec'
+                ]
+            }
+        }
+
+    def __len__(self):
+        return self.__end - self.__start
+
+    @property
+    def first_time(self):
+        return (self.__arrays['time'][self.__start] if len(self) else None)
+
+    @property
+    def last_time(self):
+        return (self.__arrays['time'][self.__end - 1] if len(self) else None)
+
+    def window(self, name):
+        return self.__arrays[name][self.__start:self.__end]
+
+    def append(self, time, ask, bid, volume):
+        len_new = len(time)
+        if self.__end + len_new > self.__capacity:
+            self._compact(size=(len(self) + len_new))
+        a = self.__arrays
+        s = slice(self.__end, self.__end + len_new)
+        a['time'][s] = time
+        a['log_mid'][s] = np.log((ask + bid) / 2)
+        np.reciprocal(np.log(ask) - np.log(bid), out=a['inv_spread'][s])
+        a['volume'][s] = volume
+        if len(self):
+            a['log_diff'][s] = np.diff(
+                a['log_mid'][(self.__end - 1):s.stop]
+            )
+            a['delta_sec'][s] = np.diff(a['time'][(self.__end - 1):s.stop])
+        elif len_new:
+            a['log_diff'][self.__end] = np.nan
+            a['log_diff'][(s.start + 1):s.stop] = np.diff(a['log_mid'][s])
+            a['delta_sec'][self.__end] = np.nan
+            a['delta_sec'][(s.start + 1):s.stop] = np.diff(a['time'][s])
+        a['delta_sec'][s] /= 1e9
+        self.__end += len_new
+        return self
+
+    def evict(self, before):
+        self.__start += int(
+            np.searchsorted(self.window('time'), before, side='left')
+        )
+        return self
+
+    def _compact(self, size):
+        len_cur = len(self)
+        if size * 2 > self.__capacity:
+            self.__capacity = size * 2
+            for k, v in self.__arrays.items():
+                a = np.empty(self.__capacity, dtype=v.dtype)
+                a[:len_cur] = v[self.__start:self.__end]
+                self.__arrays[k] = a
+        else:
+            for v in self.__arrays.values():
+                v[:len_cur] = v[self.__start:self.__end]
+        self.__start = 0
+        self.__end = len_cur
 
 
 class LogReturnFeature(object):
@@ -17,65 +92,108 @@ class LogReturnFeature(object):
             self.code = 'LR'
         else:
             raise ValueError(f'invalid feature type:\t{type}')
+        self.__buffers = dict()
 
-    def series(self, df_rate):
-        if self.code == 'LRV':
-            return self.log_return_velocity(df_rate=df_rate)
-        elif self.code == 'LRA':
-            return self.log_return_acceleration(df_rate=df_rate)
-        else:
-            return self.log_return(df_rate=df_rate)
-
-    def log_return(self, df_rate, return_df=False):
-        df_lr = df_rate.reset_index().assign(
-            log_diff=lambda d: np.log(d[['ask', 'bid']].mean(axis=1)).diff(),
-            delta_sec=lambda d: d['time'].diff().dt.total_seconds()
-        ).assign(
-            log_return=lambda d: self._weighted_log_diff(df=d)
-        ).pipe(
-            lambda d: (
-                d.iloc[d['log_return'].to_numpy().nonzero()[0]]
-                if self.__drop_zero else d
-            )
+    # series are indexed by the rate time (callers align them on it)
+    def series(self, df_rate, key=None):
+        return self._calculate_feature(
+            df_rate=df_rate, code=self.code, key=key
         )
-        self.__logger.info(
-            'Log return (tail):\t{}'.format(df_lr['log_return'].tail().values)
+
+    def unscaled_series(self, df_rate, key=None):
+        # (series, scale) where series() equals series * scale
+        return self._calculate_feature(
+            df_rate=df_rate, code=self.code, key=key, scaled=False
         )
-        return (df_lr if return_df else df_lr['log_return'])
-
-    def _weighted_log_diff(self, df):
-        return df.assign(
-            weight=lambda d: np.reciprocal(
-                np.log(d['ask']) - np.log(d['bid'])
-            ).pipe(
-                lambda s: (s / s.mean()) * (d['volume'] / d['volume'].mean())
-            )
-        ).pipe(
-            lambda d: d['log_diff'] * d['weight']
+
+    def log_return(self, df_rate, return_df=False):
+        return self._calculate_feature(
+            df_rate=df_rate, code='LR', return_df=return_df
         )
 
     def log_return_velocity(self, df_rate, return_df=False):
-        df_lrv = self.log_return(
-            df_rate=df_rate, return_df=True
-        ).assign(
-            lrv=lambda d: d['log_return'] / d['delta_sec']
+        return self._calculate_feature(
+            df_rate=df_rate, code='LRV', return_df=return_df
         )
-        self.__logger.info(
-            'Log return verocity (tail):\t{}'.format(
-                df_lrv['lrv'].tail().values
-            )
-        )
-        return (df_lrv if return_df else df_lrv['lrv'])
 
     def log_return_acceleration(self, df_rate, return_df=False):
-        df_lra = self.log_return_velocity(
-            df_rate=df_rate, return_df=True
-        ).assign(
-            lra=lambda d: d['lrv'].diff() / d['delta_sec']
+        return self._calculate_feature(
+            df_rate=df_rate, code='LRA', return_df=return_df
+        )
+
+    def _calculate_feature(self, df_rate, code, key=None, return_df=False,
+                           scaled=True):
+        buf = self._update_buffer(df_rate=df_rate, key=key)
+        inv_spread = buf.window('inv_spread')
+        volume = buf.window('volume')
+        # the window means of the weights rescale the whole series
+        scale = (
+            1 / (inv_spread.mean() * volume.mean()) if inv_spread.size
+            else np.nan
         )
-        self.__logger.info(
-            'Log return acceleration (tail):\t{}'.format(
-                df_lra['lra'].tail().values
+        log_return = buf.window('log_diff') * inv_spread * volume
+        if scaled:
+            log_return *= scale
+        if log_return.size:
+            log_return[0] = np.nan
+        log_diff = buf.window('log_diff')
+        delta_sec = buf.window('delta_sec')
+        index = df_rate.index
+        if self.__drop_zero:
+            nonzero = log_return.nonzero()[0]
+            log_return = log_return[nonzero]
+            log_diff = log_diff[nonzero]
+            delta_sec = delta_sec[nonzero]
+            index = index[nonzero]
+        columns = {
+            'log_diff': log_diff, 'delta_sec': delta_sec,
+            'log_return': log_return
+        }
+        if code in ['LRV', 'LRA']:
+            columns['lrv'] = log_return / delta_sec
+        if code == 'LRA':
+            columns['lra'] = np.empty_like(log_return)
+            columns['lra'][:1] = np.nan
+            columns['lra'][1:] = np.diff(columns['lrv']) / delta_sec[1:]
+        name = {'LR': 'log_return', 'LRV': 'lrv', 'LRA': 'lra'}[code]
+        self.__logger.debug('%s (tail):\t%s', name, columns[name][-5:])
+        if return_df:
+            # keep the rate columns and the positional index of reset_index()
+            df = df_rate.reset_index()
+            return (
+                df.iloc[nonzero] if self.__drop_zero else df
+            ).assign(**columns)
+        elif scaled:
+            return pd.Series(columns[name], index=index, name=name, copy=False)
+        else:
+            return (
+                pd.Series(columns[name], index=index, name=name, copy=False),
+                scale
             )
+
+    def _update_buffer(self, df_rate, key=None):
+        time = df_rate.index.values.astype('datetime64[ns]').view(np.int64)
+        buf = self.__buffers.get(key) if key else None
+        if (buf and time.size
+                and time[0] <= buf.last_time <= time[-1]
+                and time[0] >= buf.first_time):
+            i_new = int(np.searchsorted(time, buf.last_time, side='right'))
+            buf.append(
+                **{
+                    k: df_rate[k].to_numpy(dtype=np.float64)[i_new:]
+                    for k in ['ask', 'bid', 'volume']
+                },
+                time=time[i_new:]
+            ).evict(before=time[0])
+            if len(buf) == time.size:
+                return buf
+        buf = LogReturnBuffer(capacity=time.size).append(
+            **{
+                k: df_rate[k].to_numpy(dtype=np.float64)
+                for k in ['ask', 'bid', 'volume']
+            },
+            time=time
         )
-        return (df_lra if return_df else df_lra['lra'])
+        if key:
+            self.__buffers[key] = buf
+        return buf
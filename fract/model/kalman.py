@@ -16,25 +16,33 @@ class Kalman(object):
         self.__v0 = v0
         self.__pmv_ratio = config_dict['model']['kalman']['pmv_ratio']
         self.__ci_level = 1 - config_dict['model']['kalman']['alpha']
+        self.__optimize_interval = int(
+            config_dict['model']['kalman'].get('optimize_interval', 100)
+        )
         self.__lrfs = LRFeatureSieve(
-            type=config_dict['feature']['type'], drop_zero=True
+            type=config_dict['feature']['type'], drop_zero=True,
+            use_statsmodels=config_dict['feature'].get(
+                'statsmodels_ljungbox', False
+            ),
+            workers=config_dict['feature'].get('workers', 1)
         )
+        self.__kf_states = dict()
 
-    def detect_signal(self, history_dict, pos=None, contrary=False):
-        best_f = self.__lrfs.extract_best_feature(history_dict=history_dict)
-        kfo = KalmanFilterOptimizer(
-            y=best_f['series'], x0=self.__x0, v0=self.__v0,
-            pmv_ratio=self.__pmv_ratio
+    def detect_signal(self, history_dict, pos=None, contrary=False,
+                      instrument=None):
+        best_f = self.__lrfs.extract_best_feature(
+            history_dict=history_dict, instrument=instrument
+        )
+        kf_res = self._update_kf_state(
+            y=best_f['unscaled_series'], scale=best_f['scale'],
+            key=(instrument, best_f['granularity'])
         )
-        q, r = kfo.optimize()
-        kf = KalmanFilter(x0=self.__x0, v0=self.__v0, q=q, r=r)
-        kf_res = kf.fit(y=best_f['series']).iloc[-1].to_dict()
         self.__logger.debug(f'kf_res:\t{kf_res}')
         gauss_mu = kf_res['x']
         gauss_ci = np.asarray(
             norm.interval(
-                alpha=self.__ci_level, loc=gauss_mu,
-                scale=np.sqrt(kf_res['v'] + q)
+                self.__ci_level, loc=gauss_mu,
+                scale=np.sqrt(kf_res['v'] + kf_res['q'])
             )
         )
         sig_side = 'short' if gauss_mu * [1, -1][int(contrary)] < 0 else 'long'
@@ -56,3 +64,40 @@ class Kalman(object):
             'sig_log_str': sig_log_str, 'sig_mu': gauss_mu,
             'sig_cil': gauss_ci[0], 'sig_ciu': gauss_ci[1]
         }
+
+    def _update_kf_state(self, y, scale=1, key=None):
+        # the state is kept on the unscaled feature (x is proportional to
+        # the scale, and v, q, and r to its square)
+        st = self.__kf_states.get(key)
+        if (st and st['n_turns'] < self.__optimize_interval
+                and y.size and y.index[0] <= st['time'] <= y.index[-1]):
+            y_new = y[y.index > st['time']]
+            if y_new.size:
+                x, v = KalmanFilter.filter(
+                    y=y_new.to_numpy(), x0=st['x'], v0=st['v'], q=st['q'],
+                    r=st['r']
+                )
+                st.update({'x': x[-1], 'v': v[-1], 'time': y.index[-1]})
+                st['n_turns'] += 1
+            self.__logger.debug(f'filtered:\t{key}\t{y_new.size}')
+        else:
+            x0 = self.__x0 / scale
+            v0 = self.__v0 / scale ** 2
+            kfo = KalmanFilterOptimizer(
+                y=y, x0=x0, v0=v0, pmv_ratio=self.__pmv_ratio,
+                bracket=(
+                    (st['log_r'] - 0.5, st['log_r'] + 0.5) if st else None
+                )
+            )
+            q, r = kfo.optimize()
+            x, v = KalmanFilter.filter(y=y.to_numpy(), x0=x0, v0=v0, q=q, r=r)
+            st = {
+                'x': x[-1], 'v': v[-1], 'q': q, 'r': r, 'log_r': kfo.log_r,
+                'time': y.index[-1], 'n_turns': 0
+            }
+            self.__kf_states[key] = st
+            self.__logger.debug(f'optimized:\t{key}\t{y.size}')
+        return {
+            'x': st['x'] * scale, 'v': st['v'] * scale ** 2,
+            'q': st['q'] * scale ** 2, 'r': st['r'] * scale ** 2
+        }
@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 
-import json
 import logging
+import os
+import socket
 import time
 from datetime import datetime
 from pprint import pformat
@@ -9,31 +10,53 @@ from pprint import pformat
 import pandas as pd
 import redis
 
+from ..util.tickparser import parse_ticks
 from .base import BaseTrader
 
 
 class RedisTrader(BaseTrader):
     def __init__(self, model, config_dict, instruments, redis_host='127.0.0.1',
-                 redis_port=6379, redis_db=0, interval_sec=1, timeout_sec=3600,
-                 log_dir_path=None, ignore_api_error=False, quiet=False,
-                 dry_run=False):
+                 redis_port=6379, redis_db=0, redis_mode='list',
+                 event_driven=False, order_lock_name=None, interval_sec=1,
+                 timeout_sec=3600, log_dir_path=None, ignore_api_error=False,
+                 quiet=False, dry_run=False):
+        redis_pool = redis.ConnectionPool(
+            host=redis_host, port=int(redis_port), db=int(redis_db)
+        )
         super().__init__(
             model=model, standalone=False, ignore_api_error=ignore_api_error,
             config_dict=config_dict, instruments=instruments,
-            log_dir_path=log_dir_path, quiet=quiet, dry_run=dry_run
+            log_dir_path=log_dir_path,
+            order_lock=(
+                redis.StrictRedis(connection_pool=redis_pool).lock(
+                    order_lock_name, timeout=60
+                ) if order_lock_name else None
+            ),
+            quiet=quiet, dry_run=dry_run
         )
         self.__logger = logging.getLogger(__name__)
         self.__interval_sec = float(interval_sec)
         self.__timeout_sec = float(timeout_sec) if timeout_sec else None
-        self.__redis_pool = redis.ConnectionPool(
-            host=redis_host, port=int(redis_port), db=int(redis_db)
+        self.__redis_pool = redis_pool
+        if redis_mode not in ['list', 'stream']:
+            raise ValueError(f'invalid Redis mode:\t{redis_mode}')
+        else:
+            self.__use_stream = (redis_mode == 'stream')
+            self.__event_driven = (self.__use_stream or event_driven)
+        self.__stream_group = 'fract'
+        self.__stream_consumer = '{0}-{1}'.format(
+            socket.gethostname(), os.getpid()
         )
+        self.__stream_groups_created = False
+        self.__pending_rates = {i: list() for i in self.instruments}
         self.__is_active = True
         self.__latest_update_time = None
         self.__logger.debug('vars(self):\t' + pformat(vars(self)))
 
     def check_health(self):
         if not self.__latest_update_time:
+            if self.__is_active and self.__event_driven:
+                self._wait_for_rates()
             return self.__is_active
         elif not self.__is_active:
             self.__redis_pool.disconnect()
@@ -44,10 +67,18 @@ class RedisTrader(BaseTrader):
                 self.__logger.warning(f'Timeout:\t{self.__timeout_sec} sec')
                 self.__is_active = False
                 self.__redis_pool.disconnect()
+            elif self.__event_driven:
+                self._wait_for_rates()
             else:
                 time.sleep(self.__interval_sec)
             return self.__is_active
 
+    def select_instruments(self):
+        if self.__event_driven:
+            return [i for i in self.instruments if self.__pending_rates[i]]
+        else:
+            return self.instruments
+
     def make_decision(self, instrument):
         df_r = self._fetch_rate_df(instrument=instrument)
         if df_r.size:
@@ -63,28 +94,97 @@ class RedisTrader(BaseTrader):
         else:
             self.__logger.debug('no updated rate')
 
-    def _fetch_rate_df(self, instrument):
+    def _wait_for_rates(self):
+        if [i for i in self.instruments if self.__pending_rates[i]]:
+            pass
+        elif self.__use_stream:
+            self._read_rate_streams()
+        else:
+            self._read_rate_lists()
+
+    def _read_rate_lists(self):
         redis_c = redis.StrictRedis(connection_pool=self.__redis_pool)
-        cached_rates = [
-            json.loads(s) for s in redis_c.lrange(instrument, 0, -1)
-        ]
-        if len(cached_rates) > 0:
-            for _ in cached_rates:
-                redis_c.lpop(instrument)
-            if [r for r in cached_rates if not r['tradeable']]:
-                self.__logger.warning(f'cached_rates:\t{cached_rates}')
-                self.__is_active = False
-                return pd.DataFrame()
-            else:
-                self.__logger.debug(f'cached_rates:\t{cached_rates}')
-                return pd.DataFrame([
-                    {
-                        'time': r['time'], 'bid': r['closeoutBid'],
-                        'ask': r['closeoutAsk']
-                    } for r in cached_rates
-                ]).assign(
-                    time=lambda d: pd.to_datetime(d['time']),
-                    instrument=instrument
-                ).set_index('time')
+        popped = redis_c.blpop(
+            self.instruments, timeout=(self.__interval_sec or 1)
+        )
+        if popped:
+            self.__pending_rates[popped[0].decode()].append(popped[1])
+            with redis_c.pipeline(transaction=True) as pipe:
+                for i in self.instruments:
+                    pipe.lrange(i, 0, -1)
+                    pipe.delete(i)
+                res = pipe.execute()
+            for i, strs in zip(self.instruments, res[::2]):
+                self.__pending_rates[i].extend(strs)
+
+    def _read_rate_streams(self):
+        redis_c = redis.StrictRedis(connection_pool=self.__redis_pool)
+        if not self.__stream_groups_created:
+            for i in self.instruments:
+                try:
+                    redis_c.xgroup_create(
+                        name=i, groupname=self.__stream_group, id='$',
+                        mkstream=True
+                    )
+                except redis.exceptions.ResponseError as e:
+                    if not str(e).startswith('BUSYGROUP'):
+                        raise e
+            self.__stream_groups_created = True
+        res = redis_c.xreadgroup(
+            groupname=self.__stream_group,
+            consumername=self.__stream_consumer,
+            streams={i: '>' for i in self.instruments},
+            block=int((self.__interval_sec or 1) * 1000), noack=True
+        )
+        if res:
+            # each entry carries a price JSON in its data field:
+            #   XADD <instrument> * data <price JSON>
+            with redis_c.pipeline(transaction=False) as pipe:
+                for k, entries in res:
+                    instrument = k.decode()
+                    for e, d in entries:
+                        if b'data' in d:
+                            self.__pending_rates[instrument].append(d[b'data'])
+                        else:
+                            self.__logger.warning(
+                                'no data field in a stream entry:\t'
+                                + f'{instrument} {e.decode()} {d}'
+                            )
+                    pipe.xdel(k, *[e for e, _ in entries])
+                pipe.execute()
+
+    def _drain_rate_list(self, instrument):
+        redis_c = redis.StrictRedis(connection_pool=self.__redis_pool)
+        with redis_c.pipeline(transaction=True) as pipe:
+            pipe.lrange(instrument, 0, -1)
+            pipe.delete(instrument)
+            return pipe.execute()[0]
+
+    def _fetch_rate_df(self, instrument):
+        if self.__event_driven:
+            cached_strs = self.__pending_rates[instrument]
+            self.__pending_rates[instrument] = list()
         else:
+            cached_strs = self._drain_rate_list(instrument=instrument)
+        self.metrics.set_gauge(
+            'redis_queue_depth', len(cached_strs), instrument=instrument
+        )
+        if not cached_strs:
+            return pd.DataFrame()
+        ticks = parse_ticks(strs=cached_strs)
+        if not ticks['tradeable'].all():
+            self.__logger.warning(f'cached_rates:\t{cached_strs}')
+            self.__is_active = False
             return pd.DataFrame()
+        else:
+            self.__logger.debug('cached_rates:\t%d', len(cached_strs))
+            return pd.DataFrame(
+                {
+                    'bid': ticks['bid'], 'ask': ticks['ask'],
+                    'instrument': instrument
+                },
+                index=pd.DatetimeIndex(
+                    ticks['time'].view('datetime64[ns]'), name='time'
+                ).tz_localize('UTC'),
+                copy=False
+            )
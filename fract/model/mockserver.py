@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .broker import SimulatedBroker
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class MockOandaServer(object):
+    def __init__(self, history_dfs, account_id, host='127.0.0.1', port=8080,
+                 latency_sec=0, jitter_sec=0, speed=1, start=None,
+                 heartbeat_sec=5, balance=1000000, currency='USD',
+                 margin_rate=0.04, seed=None):
+        self.__logger = logging.getLogger(__name__)
+        self.broker = SimulatedBroker(
+            history_dfs=history_dfs, account_id=account_id, balance=balance,
+            currency=currency, margin_rate=margin_rate, start=start
+        )
+        self.__start = self.broker.now
+        self.__t0 = time.monotonic()
+        self.__speed = float(speed)
+        self.__latency_sec = float(latency_sec or 0)
+        self.__jitter_sec = float(jitter_sec or 0)
+        self.__heartbeat_sec = float(heartbeat_sec)
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__stream_routes = [
+            (
+                re.compile(r'^/v3/accounts/([^/]+)/pricing/stream$'),
+                self._stream_prices
+            ),
+            (
+                re.compile(r'^/v3/accounts/([^/]+)/transactions/stream$'),
+                self._stream_transactions
+            )
+        ]
+        self.__httpd = ThreadingHTTPServer(
+            (host, int(port)), _MockRequestHandler
+        )
+        self.__httpd.daemon_threads = True
+        self.__httpd.mock = self
+        self.__thread = None
+        self.host, self.port = self.__httpd.server_address[:2]
+        self.__logger.debug(f'self.host, self.port:\t{self.host}, {self.port}')
+
+    def serve_forever(self):
+        self.__logger.info(f'Serve on {self.host}:{self.port}')
+        self.__httpd.serve_forever()
+
+    def start(self):
+        self.__thread = threading.Thread(
+            target=self.serve_forever, daemon=True
+        )
+        self.__thread.start()
+        return self
+
+    def shutdown(self):
+        self.__httpd.shutdown()
+        self.__httpd.server_close()
+        if self.__thread:
+            self.__thread.join()
+
+    def sync_clock(self):
+        # map the elapsed wall-clock time onto the rate history
+        t = self.__start + int(
+            (time.monotonic() - self.__t0) * self.__speed * 1e9
+        )
+        with self.__lock:
+            if t > self.broker.now:
+                self.broker.advance(time=t)
+
+    def wait_latency(self):
+        if self.__latency_sec or self.__jitter_sec:
+            with self.__lock:
+                d = self.__random.uniform(-1, 1) * self.__jitter_sec
+            time.sleep(max(self.__latency_sec + d, 0))
+
+    def respond(self, method, path, params=None, body=None):
+        self.wait_latency()
+        self.sync_clock()
+        return self.broker.handle(
+            method=method, path=path, params=params, body=body
+        )
+
+    def find_stream(self, path):
+        for pattern, func in self.__stream_routes:
+            matched = pattern.match(path)
+            if matched:
+                if matched.group(1) == self.broker.account_id:
+                    return func
+                else:
+                    return None
+        return None
+
+    def _stream_prices(self, params):
+        last_times = dict()
+        last_beat = time.monotonic()
+        while True:
+            self.sync_clock()
+            _, res = self.broker.handle(
+                method='GET',
+                path=f'/v3/accounts/{self.broker.account_id}/pricing',
+                params={'instruments': params.get('instruments', '')}
+            )
+            for p in res['prices']:
+                if p['time'] != last_times.get(p['instrument']):
+                    last_times[p['instrument']] = p['time']
+                    yield p
+            last_beat = yield from self._heartbeat(last_beat=last_beat)
+
+    def _stream_transactions(self, params):
+        _, res = self.broker.handle(
+            method='GET',
+            path=f'/v3/accounts/{self.broker.account_id}/transactions/sinceid',
+            params={'id': 0}
+        )
+        last_id = res['lastTransactionID']
+        last_beat = time.monotonic()
+        while True:
+            self.sync_clock()
+            _, res = self.broker.handle(
+                method='GET',
+                path=(
+                    f'/v3/accounts/{self.broker.account_id}'
+                    + '/transactions/sinceid'
+                ),
+                params={'id': last_id}
+            )
+            yield from res['transactions']
+            last_id = res['lastTransactionID']
+            last_beat = yield from self._heartbeat(
+                last_beat=last_beat, last_id=last_id
+            )
+
+    def _heartbeat(self, last_beat, last_id=None):
+        time.sleep(0.05)
+        if time.monotonic() - last_beat < self.__heartbeat_sec:
+            return last_beat
+        else:
+            yield {
+                'type': 'HEARTBEAT',
+                'time': str(np.datetime64(self.broker.now, 'ns')) + 'Z',
+                **({'lastTransactionID': last_id} if last_id else dict())
+            }
+            return time.monotonic()
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+    def _dispatch(self):
+        mock = self.server.mock
+        method = self.command
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = (json.loads(self.rfile.read(length)) if length else None)
+        stream = (mock.find_stream(url.path) if method == 'GET' else None)
+        if stream:
+            mock.wait_latency()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for m in stream(params=params):
+                    # one chunk per message as the Oanda streaming API
+                    data = _dump_json(m) + b'\n'
+                    self.wfile.write(
+                        b'%x\r\n' % len(data) + data + b'\r\n'
+                    )
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        else:
+            status, res = mock.respond(
+                method=method, path=url.path, params=params, body=body
+            )
+            data = _dump_json(res)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = _dispatch   # noqa: N815
+
+
+def _dump_json(obj):
+    return (orjson.dumps(obj) if orjson else json.dumps(obj).encode())
@@ -1,42 +1,111 @@
 #!/usr/bin/env python
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-import pandas as pd
-import statsmodels.api as sm
-
+from ..util.ljungbox import RollingLjungBox
 from .feature import LogReturnFeature
 
 
 class LRFeatureSieve(LogReturnFeature):
-    def __init__(self, type, drop_zero=False):
+    def __init__(self, type, drop_zero=False, use_statsmodels=False,
+                 workers=1):
         super().__init__(type=type, drop_zero=drop_zero)
         self.__logger = logging.getLogger(__name__)
+        self.__use_statsmodels = use_statsmodels
+        # threads overlap the NumPy work, which releases the GIL
+        self.__executor = (
+            ThreadPoolExecutor(max_workers=int(workers))
+            if workers and int(workers) > 1 else None
+        )
+        self.__feature_cache = dict()
+        self.__ljungboxes = dict()
 
-    def extract_best_feature(self, history_dict, method='Ljung-Box'):
-        feature_dict = {
-            g: self.series(df_rate=d).dropna() for g, d in history_dict.items()
-        }
+    def extract_best_feature(self, history_dict, method='Ljung-Box',
+                             instrument=None):
+        with_pvalue = (len(history_dict) > 1 and method == 'Ljung-Box')
+        if self.__executor and len(history_dict) > 1:
+            futures = {
+                g: self.__executor.submit(
+                    self._fetch_feature, df_rate=d, key=(instrument, g),
+                    with_pvalue=with_pvalue
+                ) for g, d in history_dict.items()
+            }
+            feature_dict = {g: f.result() for g, f in futures.items()}
+        else:
+            feature_dict = {
+                g: self._fetch_feature(
+                    df_rate=d, key=(instrument, g), with_pvalue=with_pvalue
+                ) for g, d in history_dict.items()
+            }
         if len(history_dict) == 1:
             granularity = list(history_dict.keys())[0]
         elif method == 'Ljung-Box':
-            best_g = pd.DataFrame([
-                {
-                    'granularity': g,
-                    'pvalue': sm.stats.diagnostic.acorr_ljungbox(
-                        x=s, return_df=True, lags=1
-                    ).iloc[0]['lb_pvalue']
-                } for g, s in feature_dict.items()
-            ]).pipe(lambda d: d.iloc[d['pvalue'].idxmin()])
-            granularity = best_g['granularity']
-            self.__logger.debug('p-value:\t{}'.format(best_g['pvalue']))
+            granularity = min(
+                feature_dict,
+                key=lambda g: (
+                    feature_dict[g]['pvalue']
+                    if feature_dict[g]['pvalue'] == feature_dict[g]['pvalue']
+                    else float('inf')
+                )
+            )
+            self.__logger.debug(
+                'p-value:\t{}'.format(feature_dict[granularity]['pvalue'])
+            )
         else:
             raise ValueError(f'invalid method name:\t{method}')
+        best_f = feature_dict[granularity]
         return {
-            'series': feature_dict[granularity], 'granularity': granularity,
+            'series': best_f['series'] * best_f['scale'],
+            'unscaled_series': best_f['series'], 'scale': best_f['scale'],
+            'granularity': granularity,
             'granularity_str': self._granularity2str(granularity=granularity)
         }
 
+    def _fetch_feature(self, df_rate, key, with_pvalue=False):
+        cached = self.__feature_cache.get(key)
+        if cached and cached['df_rate'] is df_rate:
+            self.__logger.debug(f'cached feature:\t{key}')
+        else:
+            series, scale = self.unscaled_series(
+                df_rate=df_rate, key=(key if key[1] != 'TICK' else None)
+            )
+            cached = {
+                'df_rate': df_rate, 'series': series.dropna(),
+                'scale': scale, 'pvalue': None
+            }
+            self.__feature_cache[key] = cached
+        if with_pvalue and cached['pvalue'] is None:
+            cached['pvalue'] = self._calculate_ljungbox_pvalue(
+                series=cached['series'], key=key
+            )
+        return cached
+
+    def _calculate_ljungbox_pvalue(self, series, key):
+        # unscaled values keep the rolling sums comparable between turns
+        # (the statistic is scale-invariant)
+        lb = self.__ljungboxes.get(key)
+        if (lb and series.size
+                and series.index[0] <= lb.last_time <= series.index[-1]):
+            i_new = series.index.searchsorted(lb.last_time, side='right')
+            lb.append(
+                times=series.index[i_new:], values=series.to_numpy()[i_new:]
+            ).evict(before=series.index[0])
+        else:
+            lb = RollingLjungBox().append(times=series.index, values=series)
+            self.__ljungboxes[key] = lb
+        if self.__use_statsmodels:
+            import statsmodels.api as sm
+            pvalue = sm.stats.diagnostic.acorr_ljungbox(
+                x=series, return_df=True, lags=1
+            ).iloc[0]['lb_pvalue']
+            self.__logger.debug(
+                f'p-value:\t{key}\tstatsmodels:{pvalue}\trolling:{lb.pvalue}'
+            )
+            return pvalue
+        else:
+            return lb.pvalue
+
     @staticmethod
     def _granularity2str(granularity='S5'):
         return (
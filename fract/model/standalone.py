@@ -6,20 +6,30 @@ from datetime import datetime
 from pprint import pformat
 
 from .base import BaseTrader
+from .streaming import PriceStream
 
 
 class StandaloneTrader(BaseTrader):
     def __init__(self, model, config_dict, instruments, interval_sec=1,
-                 timeout_sec=3600, log_dir_path=None, ignore_api_error=False,
-                 quiet=False, dry_run=False):
+                 timeout_sec=3600, log_dir_path=None, order_lock=None,
+                 ignore_api_error=False, quiet=False, dry_run=False):
+        use_stream = bool(config_dict['oanda'].get('price_stream'))
         super().__init__(
-            model=model, standalone=True, ignore_api_error=ignore_api_error,
-            config_dict=config_dict, instruments=instruments,
-            log_dir_path=log_dir_path, quiet=quiet, dry_run=dry_run
+            model=model, standalone=(not use_stream),
+            ignore_api_error=ignore_api_error, config_dict=config_dict,
+            instruments=instruments, log_dir_path=log_dir_path,
+            order_lock=order_lock, quiet=quiet, dry_run=dry_run
         )
         self.__logger = logging.getLogger(__name__)
         self.__interval_sec = float(interval_sec)
         self.__timeout_sec = float(timeout_sec) if timeout_sec else None
+        self.__price_stream = (
+            PriceStream(
+                config_dict=self.cf, instruments=self.instruments,
+                timeout_sec=self.cf['oanda'].get('stream_timeout_sec', 10),
+                metrics=self.metrics
+            ) if use_stream else None
+        )
         self.__latest_update_time = None
         self.__logger.debug('vars(self):\t' + pformat(vars(self)))
 
@@ -27,16 +37,63 @@ class StandaloneTrader(BaseTrader):
         if not self.__latest_update_time:
             return True
         else:
+            if self._is_streaming():
+                # heartbeats keep the trader alive in a quiet market
+                self.__latest_update_time = max(
+                    self.__latest_update_time,
+                    self.__price_stream.last_message_time
+                )
             td = datetime.now() - self.__latest_update_time
             if self.__timeout_sec and td.total_seconds() > self.__timeout_sec:
                 self.__logger.warning(f'Timeout:\t{self.__timeout_sec} sec')
+                if self.__price_stream:
+                    self.__price_stream.stop()
                 return False
+            elif self._is_streaming():
+                self.__price_stream.wait(timeout=(self.__interval_sec or 1))
+                return True
             else:
                 time.sleep(self.__interval_sec)
                 return True
 
+    def _is_streaming(self):
+        return bool(
+            self.__price_stream and self.__price_stream.started
+            and self.__price_stream.is_fresh
+        )
+
+    def select_instruments(self):
+        if self._is_streaming():
+            return self.__price_stream.pending_instruments()
+        else:
+            return self.instruments
+
+    def refresh_oanda_dicts(self):
+        super().refresh_oanda_dicts()
+        if self.__price_stream and not self.__price_stream.started:
+            self.__price_stream.start(
+                quote_instruments=self.quote_instruments()
+            )
+
+    def _refresh_price_dict(self):
+        # streamed prices replace polling unless the stream is stale
+        prices = (
+            self.__price_stream.prices() if self._is_streaming() else None
+        )
+        if prices and all(i in prices for i in self.instruments):
+            self.price_dict = {**self.price_dict, **prices}
+        else:
+            super()._refresh_price_dict()
+
     def make_decision(self, instrument):
-        df_r = self.fetch_latest_price_df(instrument=instrument)
+        df_r = (
+            self.__price_stream.drain(instrument=instrument)
+            if self._is_streaming() else None
+        )
+        if df_r is not None and df_r.size:
+            self.update_caches(df_rate=df_r)
+        else:
+            df_r = self.fetch_latest_price_df(instrument=instrument)
         st = self.determine_sig_state(df_rate=df_r)
         self.print_state_line(df_rate=df_r, add_str=st['log_str'])
         self.design_and_place_order(instrument=instrument, act=st['act'])
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+
+import logging
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from requests.exceptions import RequestException
+from v20 import Context, V20ConnectionError, V20Timeout
+
+from ..util.tickparser import parse_rfc3339_ns
+
+
+class StreamResponseError(RuntimeError):
+    pass
+
+
+class V20Stream(object, metaclass=ABCMeta):
+    # background v20 stream with heartbeat monitoring and reconnection
+    def __init__(self, config_dict, timeout_sec=10, reconnect_sec=1,
+                 max_reconnect_sec=60, metrics=None, api=None):
+        self.__logger = logging.getLogger(__name__)
+        oanda_cf = config_dict['oanda']
+        self.__timeout_sec = float(timeout_sec)
+        self.api = api or Context(
+            hostname=(
+                oanda_cf.get('stream_hostname')
+                or 'stream-fx{}.oanda.com'.format(oanda_cf['environment'])
+            ),
+            port=int(oanda_cf.get('port') or 443),
+            ssl=oanda_cf.get('ssl', True), token=oanda_cf['token'],
+            stream_timeout=self.__timeout_sec
+        )
+        self.account_id = oanda_cf['account_id']
+        self.metrics = metrics
+        self.__reconnect_sec = float(reconnect_sec)
+        self.__max_reconnect_sec = float(max_reconnect_sec)
+        self.__lock = threading.Lock()
+        self.__last_message_time = None
+        self.__last_message_datetime = None
+        self.__stopped = threading.Event()
+        self.__thread = None
+        self.connections = 0
+        self.reconnects = 0
+
+    def start(self):
+        self.__thread = threading.Thread(
+            target=self._run, name=f'fract-{type(self).__name__}',
+            daemon=True
+        )
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__stopped.set()
+        self._on_stop()
+        if self.__thread:
+            self.__thread.join(timeout=self.__timeout_sec)
+
+    @property
+    def started(self):
+        return bool(self.__thread)
+
+    @property
+    def stopped(self):
+        return self.__stopped.is_set()
+
+    @property
+    def last_message_time(self):
+        # wall-clock time of the last heartbeat or message
+        with self.__lock:
+            return self.__last_message_datetime
+
+    @property
+    def is_fresh(self):
+        # a heartbeat or message has arrived within the timeout
+        with self.__lock:
+            return bool(
+                self.__last_message_time
+                and time.monotonic() - self.__last_message_time
+                < self.__timeout_sec
+            )
+
+    def _run(self):
+        delay = self.__reconnect_sec
+        while not self.__stopped.is_set():
+            try:
+                if self._consume():
+                    delay = self.__reconnect_sec
+            except (V20ConnectionError, V20Timeout, StreamResponseError,
+                    RequestException) as e:
+                self.__logger.warning(f'Stream lost:\t{e}')
+            if not self.__stopped.is_set():
+                self.reconnects += 1
+                if self.metrics:
+                    self.metrics.count(
+                        'stream_reconnects_total', stream=type(self).__name__
+                    )
+                self.__logger.info(f'Reconnect in {delay} sec')
+                self.__stopped.wait(delay)
+                delay = min(delay * 2, self.__max_reconnect_sec)
+
+    def _consume(self):
+        res = self._open()
+        if not (100 <= res.status <= 399):
+            raise StreamResponseError(f'unexpected status:\t{res.status}')
+        self.connections += 1
+        n_messages = 0
+        for msg_type, msg in res.parts():
+            if self.__stopped.is_set():
+                break
+            n_messages += 1
+            with self.__lock:
+                self.__last_message_time = time.monotonic()
+                self.__last_message_datetime = datetime.now()
+            self._handle(msg_type=msg_type, msg=msg)
+            if self.metrics:
+                self.metrics.count('stream_messages_total', type=msg_type)
+        return n_messages
+
+    @abstractmethod
+    def _open(self):
+        pass
+
+    @abstractmethod
+    def _handle(self, msg_type, msg):
+        pass
+
+    def _on_stop(self):
+        pass
+
+
+class PriceStream(V20Stream):
+    # shared price table and tick queues fed by the pricing stream
+    def __init__(self, config_dict, instruments, **kwargs):
+        super().__init__(config_dict=config_dict, **kwargs)
+        self.__logger = logging.getLogger(__name__)
+        self.instruments = list(instruments)
+        self.__lock = threading.Lock()
+        self.__updated = threading.Condition(self.__lock)
+        self.__prices = dict()
+        self.__ticks = {i: list() for i in self.instruments}
+        self.__subscribed = list(self.instruments)
+
+    def start(self, quote_instruments=None):
+        # quote instruments are priced without queueing ticks
+        self.__subscribed = self.instruments + [
+            i for i in (quote_instruments or list())
+            if i not in self.instruments
+        ]
+        self.__logger.info('Start a pricing stream:\t{}'.format(
+            ','.join(self.__subscribed)
+        ))
+        return super().start()
+
+    def _on_stop(self):
+        with self.__updated:
+            self.__updated.notify_all()
+
+    def _open(self):
+        return self.api.pricing.stream(
+            accountID=self.account_id,
+            instruments=','.join(self.__subscribed), snapshot=True
+        )
+
+    def _handle(self, msg_type, msg):
+        if msg_type == 'pricing.ClientPrice':
+            i = msg.instrument
+            t = parse_rfc3339_ns(strs=[msg.time])[0]
+            with self.__updated:
+                self.__prices[i] = {
+                    'bid': msg.closeoutBid, 'ask': msg.closeoutAsk,
+                    'tradeable': msg.tradeable
+                }
+                if i in self.__ticks:
+                    self.__ticks[i].append(
+                        (t, msg.closeoutBid, msg.closeoutAsk)
+                    )
+                self.__updated.notify_all()
+
+    def prices(self):
+        with self.__lock:
+            return {k: dict(v) for k, v in self.__prices.items()}
+
+    def pending_instruments(self):
+        with self.__lock:
+            return [i for i in self.instruments if self.__ticks[i]]
+
+    def wait(self, timeout=None):
+        # block until any tick is queued
+        with self.__updated:
+            self.__updated.wait_for(
+                lambda: (
+                    self.stopped or any(v for v in self.__ticks.values())
+                ),
+                timeout=timeout
+            )
+
+    def drain(self, instrument):
+        with self.__lock:
+            ticks = self.__ticks[instrument]
+            self.__ticks[instrument] = list()
+        if not ticks:
+            return pd.DataFrame()
+        else:
+            times, bids, asks = zip(*ticks)
+            return pd.DataFrame(
+                {
+                    'bid': np.array(bids, dtype=np.float64),
+                    'ask': np.array(asks, dtype=np.float64),
+                    'instrument': instrument
+                },
+                index=pd.DatetimeIndex(
+                    np.array(times, dtype=np.int64).view('datetime64[ns]'),
+                    name='time'
+                ).tz_localize('UTC'),
+                copy=False
+            )
+
+
+class TransactionStream(V20Stream):
+    # queue of account transactions fed by the transactions stream
+    def __init__(self, config_dict, **kwargs):
+        super().__init__(config_dict=config_dict, **kwargs)
+        self.__logger = logging.getLogger(__name__)
+        self.__lock = threading.Lock()
+        self.__updated = threading.Condition(self.__lock)
+        self.__txns = list()
+        self.__last_id = 0
+        self.heartbeat_txn_id = 0
+
+    def start(self):
+        self.__logger.info('Start a transaction stream')
+        return super().start()
+
+    def _on_stop(self):
+        with self.__updated:
+            self.__updated.notify_all()
+
+    def _open(self):
+        return self.api.transaction.stream(accountID=self.account_id)
+
+    def _handle(self, msg_type, msg):
+        with self.__updated:
+            if msg_type == 'transaction.TransactionHeartbeat':
+                self.heartbeat_txn_id = int(msg.lastTransactionID)
+            elif msg_type == 'transaction.Transaction':
+                t = msg.dict()
+                self.__txns.append(t)
+                self.__last_id = max(self.__last_id, int(t['id']))
+            self.__updated.notify_all()
+
+    def drain(self):
+        with self.__lock:
+            txns = self.__txns
+            self.__txns = list()
+        return txns
+
+    def wait_for_id(self, txn_id, timeout=None):
+        # block until a transaction with the ID or later is queued
+        with self.__updated:
+            return self.__updated.wait_for(
+                lambda: self.stopped or self.__last_id >= int(txn_id),
+                timeout=timeout
+            )
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from ..util.ewm import ewm_mean_std
+from ..util.history import resample_rate_df
+from ..util.kalmanfilter import KalmanFilter, KalmanFilterOptimizer
+from .feature import LogReturnFeature
+
+
+class ParameterSweep(object):
+    def __init__(self, config_dict, model='ewma', granularity='S5',
+                 workers=1):
+        self.__logger = logging.getLogger(__name__)
+        self.cf = config_dict
+        if model == 'ewma':
+            grid_keys = ['alpha', 'sigma_band']
+        elif model == 'kalman':
+            grid_keys = ['pmv_ratio', 'alpha']
+        else:
+            raise ValueError(f'invalid model name:\t{model}')
+        self.__model = model
+        self.__granularity = granularity
+        self.__n_workers = max(int(workers or 1), 1)
+        grid_cf = self.cf.get('sweep', dict()).get(model, dict())
+        self.__grid = {
+            k: np.atleast_1d(
+                grid_cf.get(k, self.cf['model'][model][k])
+            ).astype(float) for k in grid_keys
+        }
+        self.__contrary = (self.cf['position']['side'] == 'contrarian')
+        self.__window = int(self.cf['feature']['cache'])
+        self.__lrf = LogReturnFeature(
+            type=self.cf['feature']['type'], drop_zero=(model == 'kalman')
+        )
+
+    def run(self, history_dfs):
+        return pd.concat(
+            [
+                self._sweep_instrument(df_rate=d).assign(instrument=i)
+                for i, d in history_dfs.items()
+            ],
+            ignore_index=True
+        ).pipe(
+            lambda d: d[
+                ['instrument', 'granularity'] + [
+                    c for c in d.columns
+                    if c not in {'instrument', 'granularity'}
+                ]
+            ]
+        ).sort_values('pl', ascending=False, ignore_index=True)
+
+    def _sweep_instrument(self, df_rate):
+        df_g = resample_rate_df(df=df_rate, granularity=self.__granularity)
+        y = self.__lrf.series(df_rate=df_g).dropna()
+        df_y = df_g.loc[y.index]
+        log_mid = np.log((df_y['ask'] + df_y['bid']).to_numpy() / 2)
+        kwargs = {
+            'y': y.to_numpy(),
+            'earn': np.append(np.diff(log_mid), 0),
+            'cost': (
+                (df_y['ask'] - df_y['bid']) / (df_y['ask'] + df_y['bid'])
+            ).to_numpy(),
+            'contrary': self.__contrary
+        }
+        self.__logger.info(f'Sweep:\t{self.__model}\t{y.size} values')
+        # split the first grid axis across worker processes
+        chunks = [
+            c for c in np.array_split(
+                next(iter(self.__grid.values())), self.__n_workers
+            ) if c.size
+        ]
+        if self.__model == 'ewma':
+            func = partial(
+                _sweep_ewma, sigma_bands=self.__grid['sigma_band'], **kwargs
+            )
+        else:
+            func = partial(
+                _sweep_kalman, alphas=self.__grid['alpha'],
+                window=self.__window, **kwargs
+            )
+        if len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as x:
+                dfs = list(x.map(func, chunks))
+        else:
+            dfs = [func(c) for c in chunks]
+        return pd.concat(dfs, ignore_index=True).assign(
+            granularity=self.__granularity
+        )
+
+
+def _sweep_ewma(alphas, sigma_bands, y, earn, cost, contrary=False):
+    mean, std = ewm_mean_std(x=y, alphas=alphas)
+    sign = (-1 if contrary else 1)
+    return pd.DataFrame([
+        {
+            'alpha': a, 'sigma_band': s,
+            **_simulate(
+                sig=_band_signal(
+                    mu=mean[i], half_width=(std[i] * s), sign=sign
+                ),
+                earn=earn, cost=cost
+            )
+        } for (i, a), s in product(enumerate(alphas), sigma_bands)
+    ])
+
+
+def _sweep_kalman(pmv_ratios, alphas, y, earn, cost, window=5000,
+                  contrary=False, x0=0, v0=1e-8):
+    q, r = np.array([
+        KalmanFilterOptimizer(
+            y=y[:window], x0=x0, v0=v0, pmv_ratio=p
+        ).optimize() for p in pmv_ratios
+    ]).T
+    x, v = KalmanFilter.filter_batch(y=y, x0=x0, v0=v0, q=q, r=r)
+    scale = np.sqrt(v + q[:, None])
+    sign = (-1 if contrary else 1)
+    return pd.DataFrame([
+        {
+            'pmv_ratio': p, 'alpha': a, 'q': q[i], 'r': r[i],
+            **_simulate(
+                sig=_band_signal(
+                    mu=x[i], half_width=(scale[i] * norm.ppf(1 - a / 2)),
+                    sign=sign
+                ),
+                earn=earn, cost=cost
+            )
+        } for (i, p), a in product(enumerate(pmv_ratios), alphas)
+    ])
+
+
+def _band_signal(mu, half_width, sign=1):
+    return np.where(
+        (mu - half_width > 0) | (mu + half_width < 0),
+        np.where(mu < 0, -sign, sign), 0
+    ).astype(np.int8)
+
+
+def _simulate(sig, earn, cost):
+    # hold the latest signal side and pay a half spread per unit traded
+    i_last = np.where(sig != 0, np.arange(sig.size), 0)
+    pos = sig[np.maximum.accumulate(i_last)]
+    traded = np.abs(np.diff(pos, prepend=0))
+    return {
+        'signals': int(np.count_nonzero(sig)),
+        'trades': int(np.count_nonzero(traded)),
+        'pl': float(np.dot(pos, earn) - np.dot(traded, cost))
+    }
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+from collections import deque
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+class RollingEwm(object):
+    # pandas.Series.ewm(alpha, adjust=True) mean and std over a sliding window
+    def __init__(self, alpha=0.02):
+        self.alpha = alpha
+        self.__times = deque()
+        self.__values = deque()
+        self.__sums = np.zeros(4)       # sum of w, w ** 2, w * x, w * x ** 2
+        self.__nobs = 0
+        self.__n_evicted = 0
+
+    def __len__(self):
+        return len(self.__values)
+
+    @property
+    def last_time(self):
+        return (self.__times[-1] if self.__times else None)
+
+    def _weighted_sums(self, x, offset=0):
+        # x[-1] is weighted by (1 - alpha) ** offset
+        b = 1 - self.alpha
+        valid = ~np.isnan(x)
+        w = np.power(b, np.arange(x.size - 1 + offset, offset - 1, -1))[valid]
+        x = x[valid]
+        wx = w * x
+        return np.array([w.sum(), np.dot(w, w), wx.sum(), np.dot(wx, x)])
+
+    def append(self, times, values):
+        x = np.asarray(values, dtype=float)
+        if x.size:
+            b = 1 - self.alpha
+            self.__sums *= np.power([b, b * b, b, b], x.size)
+            self.__sums += self._weighted_sums(x=x)
+            self.__times.extend(times)
+            self.__values.extend(x.tolist())
+            self.__nobs += int(np.count_nonzero(~np.isnan(x)))
+        return self
+
+    def evict(self, before):
+        evicted = list()
+        while self.__times and self.__times[0] < before:
+            self.__times.popleft()
+            evicted.append(self.__values.popleft())
+        if evicted:
+            x = np.array(evicted)
+            self.__sums -= self._weighted_sums(x=x, offset=len(self.__values))
+            self.__nobs -= int(np.count_nonzero(~np.isnan(x)))
+            self.__n_evicted += x.size
+        if self.__n_evicted > len(self.__values):
+            self._recompute_sums()
+        return self
+
+    def _recompute_sums(self):
+        self.__sums = self._weighted_sums(
+            x=np.fromiter(self.__values, dtype=float)
+        )
+        self.__n_evicted = 0
+
+    @property
+    def mean(self):
+        sum_wt, _, sum_wx, _ = self.__sums
+        return (sum_wx / sum_wt if self.__nobs else np.nan)
+
+    @property
+    def var(self):
+        sum_wt, sum_wt2, sum_wx, sum_wx2 = self.__sums
+        if self.__nobs < 2:
+            return np.nan
+        else:
+            m = sum_wx / sum_wt
+            numerator = sum_wt * sum_wt
+            denominator = numerator - sum_wt2
+            return (
+                max(sum_wx2 / sum_wt - m * m, 0) * numerator / denominator
+                if denominator > 0 else np.nan
+            )
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+
+def ewm_mean_std(x, alphas):
+    # pandas.Series.ewm(alpha, adjust=True) mean and std for many alphas
+    x = np.asarray(x, dtype=float)
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+    mean = np.empty((alphas.size, x.size))
+    std = np.empty((alphas.size, x.size))
+    ones = np.ones_like(x)
+    for i, a in enumerate(alphas):
+        b = 1 - a
+        sum_wt = lfilter([1], [1, -b], ones)
+        sum_wt2 = lfilter([1], [1, -b * b], ones)
+        mean[i] = lfilter([1], [1, -b], x) / sum_wt
+        var = np.maximum(
+            lfilter([1], [1, -b], x * x) / sum_wt - mean[i] ** 2, 0
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std[i] = np.sqrt(
+                var * sum_wt * sum_wt / (sum_wt * sum_wt - sum_wt2)
+            )
+    std[:, :1] = np.nan
+    return mean, std
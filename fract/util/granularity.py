@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+
+
+def granularity2sec(granularity='S5'):
+    if granularity == 'TICK':
+        return 0
+    elif granularity in ['D', 'W', 'M']:
+        return {'D': 86400, 'W': 604800, 'M': 2419200}[granularity]
+    else:
+        return int(granularity[1:]) * {'S': 1, 'M': 60, 'H': 3600}[
+            granularity[0]
+        ]
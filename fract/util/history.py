@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+import logging
+import re
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .granularity import granularity2sec
+from .tickparser import parse_ticks
+
+_SUFFIXES = {
+    'sqlite': {'.sqlite', '.sqlite3', '.db'}, 'parquet': {'.parquet', '.pq'},
+    'csv': {'.csv', '.tsv'}
+}
+
+
+def read_history_dfs(path, instruments=None):
+    logger = logging.getLogger(__name__)
+    p = Path(path).resolve()
+    if p.is_dir():
+        file_paths = sorted(
+            f for f in p.iterdir()
+            if f.suffix.lower() in set().union(*_SUFFIXES.values())
+        )
+    elif p.is_file():
+        file_paths = [p]
+    else:
+        raise FileNotFoundError(f'file not found:\t{p}')
+    dfs = dict()
+    for f in file_paths:
+        logger.info(f'Read history:\t{f}')
+        for i, df in _read_history_file(path=f).items():
+            if not instruments or i in instruments:
+                dfs[i] = dfs.get(i, list()) + [df]
+    if not dfs:
+        raise ValueError(f'no rate history:\t{p}')
+    else:
+        return {
+            i: pd.concat(v).pipe(
+                lambda d: d[~d.index.duplicated(keep='last')]
+            ).sort_index() for i, v in dfs.items()
+        }
+
+
+def _read_history_file(path):
+    suffix = path.suffix.lower()
+    if suffix in _SUFFIXES['sqlite']:
+        with sqlite3.connect(str(path)) as con:
+            tables = pd.read_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'table';", con
+            )['name'].tolist()
+            # only known table names are interpolated into the query
+            table = next(
+                (t for t in ['candle', 'pricing_stream'] if t in tables), None
+            )
+            if table:
+                df = pd.read_sql(f'SELECT * FROM {table};', con)
+            else:
+                raise ValueError(f'no rate table:\t{path}')
+    elif suffix in _SUFFIXES['parquet']:
+        df = pd.read_parquet(str(path))
+    elif suffix in _SUFFIXES['csv']:
+        df = pd.read_csv(str(path), sep=(',' if suffix == '.csv' else '\t'))
+    else:
+        raise ValueError(f'invalid file type:\t{path}')
+    if 'instrument' not in df.columns:
+        matched = re.findall(r'[A-Z]{3}_[A-Z]{3}', path.name)
+        if matched:
+            df = df.assign(instrument=matched[0])
+        else:
+            raise ValueError(f'instrument not specified:\t{path}')
+    return {
+        i: _normalize_rate_df(df=d)
+        for i, d in df[df['instrument'] != ''].groupby('instrument')
+    }
+
+
+def _normalize_rate_df(df):
+    if 'json' in df.columns:
+        ticks = parse_ticks(strs=df['json'].tolist())
+        return pd.DataFrame(
+            {
+                'bid': ticks['bid'], 'ask': ticks['ask'],
+                'volume': np.ones(ticks['bid'].size)
+            },
+            index=pd.DatetimeIndex(
+                ticks['time'].view('datetime64[ns]'), name='time'
+            ).tz_localize('UTC')
+        )
+    elif 'closeBid' in df.columns:
+        return pd.DataFrame(
+            {
+                'bid': df['closeBid'].to_numpy(dtype=float),
+                'ask': df['closeAsk'].to_numpy(dtype=float),
+                'volume': df['volume'].to_numpy(dtype=float),
+                **{
+                    f'{k}_{t.lower()}': df[f'{t}{k.capitalize()}'].to_numpy(
+                        dtype=float
+                    ) for k in ['bid', 'ask'] for t in ['high', 'low']
+                    if f'{t}{k.capitalize()}' in df.columns
+                }
+            },
+            index=pd.DatetimeIndex(
+                pd.to_datetime(df['time'], utc=True), name='time'
+            )
+        )
+    elif {'bid', 'ask'} <= set(df.columns):
+        return pd.DataFrame(
+            {
+                'bid': df['bid'].to_numpy(dtype=float),
+                'ask': df['ask'].to_numpy(dtype=float),
+                'volume': (
+                    df['volume'].to_numpy(dtype=float)
+                    if 'volume' in df.columns else np.ones(len(df))
+                )
+            },
+            index=pd.DatetimeIndex(
+                pd.to_datetime(df['time'], utc=True), name='time'
+            )
+        )
+    else:
+        raise ValueError(f'invalid rate columns:\t{df.columns.tolist()}')
+
+
+def resample_rate_df(df, granularity):
+    g_ns = granularity2sec(granularity) * 10**9
+    time = df.index.values.astype('datetime64[ns]').view(np.int64)
+    start, i_first = np.unique(time // g_ns * g_ns, return_index=True)
+    i_last = np.append(i_first[1:], time.size) - 1
+    return pd.DataFrame(
+        {
+            'bid': df['bid'].to_numpy()[i_last],
+            'ask': df['ask'].to_numpy()[i_last],
+            'volume': np.add.reduceat(df['volume'].to_numpy(), i_first)
+        },
+        index=pd.DatetimeIndex(
+            start.view('datetime64[ns]'), name='time'
+        ).tz_localize('UTC')
+    )
+
+
+def generate_history_dfs(instruments, start, end, freq_sec=1,
+                         currency='USD', volatility=1e-5, spread=2e-5,
+                         seed=None):
+    # random-walk ticks, with the pairs needed for home currency conversion
+    insts = list(instruments)
+    for i in instruments:
+        quote = i.split('_')[1]
+        if (currency not in i.split('_')
+                and f'{currency}_{quote}' not in insts
+                and f'{quote}_{currency}' not in insts):
+            insts.append(f'{quote}_{currency}')
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        start=pd.to_datetime(start, utc=True),
+        end=pd.to_datetime(end, utc=True),
+        freq=f'{int(freq_sec)}s', name='time'
+    )
+    dfs = dict()
+    for i in insts:
+        mid = (100.0 if i.endswith('_JPY') else 1.0) * np.exp(
+            np.cumsum(rng.normal(scale=volatility, size=index.size))
+        )
+        half_spread = mid * spread / 2
+        dfs[i] = pd.DataFrame(
+            {
+                'bid': mid - half_spread, 'ask': mid + half_spread,
+                'volume': np.ones(index.size)
+            },
+            index=index
+        )
+    return dfs
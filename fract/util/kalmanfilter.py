@@ -6,6 +6,7 @@ import os
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize_scalar
+from scipy.signal import lfilter
 
 
 class KalmanFilter(object):
@@ -23,14 +24,9 @@ class KalmanFilter(object):
         q_ = q or self.q
         r_ = r or self.r
         len_y = len(y)
-        new_x = np.empty(len_y)
-        new_v = np.empty(len_y)
-        for i, y_n in enumerate(y):
-            x_n_1 = (new_x[i - 1] if i else x0_)
-            v_n_1 = (new_v[i - 1] if i else v0_) + q_
-            k = v_n_1 / (v_n_1 + r_)
-            new_x[i] = x_n_1 + k * (y_n - x_n_1)
-            new_v[i] = (1 - k) * v_n_1
+        new_x, new_v = self.filter(
+            y=np.asarray(y, dtype=float), x0=x0_, v0=v0_, q=q_, r=r_
+        )
         if self.__keep_history:
             self.x = np.append(self.x, new_x)
             self.v = np.append(self.v, new_v)
@@ -43,22 +39,80 @@ class KalmanFilter(object):
             index=(y.index if hasattr(y, 'index') else range(len_y))
         )
 
+    @staticmethod
+    def filter(y, x0, v0, q, r, rtol=1e-14):
+        len_y = len(y)
+        q_ = float(q)
+        r_ = float(r)
+        v_list = list()
+        v_n_1 = v_n = float(v0)
+        while len(v_list) < len_y:
+            v_n = (v_n_1 + q_) * r_ / (v_n_1 + q_ + r_)
+            v_list.append(v_n)
+            if abs(v_n - v_n_1) <= rtol * v_n_1:
+                break
+            else:
+                v_n_1 = v_n
+        len_t = len(v_list)         # transient length before convergence
+        v = np.empty(len_y)
+        v[:len_t] = v_list
+        v[len_t:] = v_n
+        p = np.append(v0, v[:-1]) + q_
+        k = p / (p + r_)
+        x = np.empty(len_y)
+        x_list = list()
+        x_n = float(x0)
+        for k_n, y_n in zip(k[:len_t].tolist(), y[:len_t].tolist()):
+            x_n += k_n * (y_n - x_n)
+            x_list.append(x_n)
+        x[:len_t] = x_list
+        if len_t < len_y:
+            # the gain is constant after the variance has converged
+            x[len_t:] = lfilter(
+                [k[len_t]], [1, k[len_t] - 1], y[len_t:],
+                zi=[(1 - k[len_t]) * x_n]
+            )[0]
+        return x, v
+
+    @staticmethod
+    def filter_batch(y, x0, v0, q, r, rtol=1e-14):
+        # filter with many (q, r) pairs at once (rows of x and v)
+        y_ = np.asarray(y, dtype=float)
+        xv = [
+            KalmanFilter.filter(y=y_, x0=x0, v0=v0, q=q_i, r=r_i, rtol=rtol)
+            for q_i, r_i in zip(
+                *np.broadcast_arrays(np.atleast_1d(q), np.atleast_1d(r))
+            )
+        ]
+        return (
+            np.array([a[0] for a in xv]).reshape(-1, y_.size),
+            np.array([a[1] for a in xv]).reshape(-1, y_.size)
+        )
+
 
 class KalmanFilterOptimizer(object):
-    def __init__(self, y, x0=0, v0=1e-8, pmv_ratio=1, method='Golden'):
+    def __init__(self, y, x0=0, v0=1e-8, pmv_ratio=1, method='Golden',
+                 bracket=None):
         self.__logger = logging.getLogger(__name__)
         self.y = y
         self.x0 = x0
         self.v0 = v0
         self.__pmv_ratio = pmv_ratio    # process / measurement variance ratio
         self.__method = method          # Brent | Bounded | Golden
+        self.__bracket = bracket        # initial bracket of log(r)
+        self.log_r = None
 
     def optimize(self):
         res = minimize_scalar(
-            fun=self._loss, args=(self.y, self.x0, self.v0, self.__pmv_ratio),
-            method=self.__method
+            fun=self._loss,
+            args=(
+                np.asarray(self.y, dtype=float), self.x0, self.v0,
+                self.__pmv_ratio
+            ),
+            method=self.__method, bracket=self.__bracket
         )
         self.__logger.debug(f'{os.linesep}{res}')
+        self.log_r = res.x
         r = np.exp(res.x)
         self.__logger.debug(f'measurement variance:\t{r}')
         q = r * self.__pmv_ratio
@@ -68,10 +122,5 @@ class KalmanFilterOptimizer(object):
     @staticmethod
     def _loss(a, y, x0, v0, pmv_ratio=1):
         r = np.exp(a)
-        return KalmanFilter(
-            x0=x0, v0=v0, q=(r * pmv_ratio), r=r
-        ).fit(y=y).pipe(
-            lambda d: np.sum(
-                np.log(d['v'] + r) + np.square(d['y'] - d['x']) / (d['v'] + r)
-            )
-        )
+        x, v = KalmanFilter.filter(y=y, x0=x0, v0=v0, q=(r * pmv_ratio), r=r)
+        return np.sum(np.log(v + r) + np.square(y - x) / (v + r))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+from collections import deque
+from math import erfc, sqrt
+
+import numpy as np
+
+
+class RollingLjungBox(object):
+    # Ljung-Box Q-statistic with lags=1 over a sliding window
+    def __init__(self):
+        self.__times = deque()
+        self.__values = deque()
+        self.__sum_x = 0.0
+        self.__sum_x2 = 0.0
+        self.__sum_xx1 = 0.0                # sum of x[t] * x[t - 1]
+        self.__n_evicted = 0
+
+    def __len__(self):
+        return len(self.__values)
+
+    @property
+    def last_time(self):
+        return (self.__times[-1] if self.__times else None)
+
+    def append(self, times, values):
+        x = np.asarray(values, dtype=float)
+        if x.size:
+            x_1 = (np.append(self.__values[-1], x) if self.__values else x)
+            self.__sum_x += float(x.sum())
+            self.__sum_x2 += float(np.dot(x, x))
+            self.__sum_xx1 += float(np.dot(x_1[1:], x_1[:-1]))
+            self.__times.extend(times)
+            self.__values.extend(x.tolist())
+        return self
+
+    def evict(self, before):
+        while self.__times and self.__times[0] < before:
+            self.__times.popleft()
+            x = self.__values.popleft()
+            self.__sum_x -= x
+            self.__sum_x2 -= x * x
+            if self.__values:
+                self.__sum_xx1 -= x * self.__values[0]
+            self.__n_evicted += 1
+        if self.__n_evicted > len(self.__values):
+            self._recompute_sums()
+        return self
+
+    def _recompute_sums(self):
+        x = np.fromiter(self.__values, dtype=float)
+        self.__sum_x = float(x.sum())
+        self.__sum_x2 = float(np.dot(x, x))
+        self.__sum_xx1 = float(np.dot(x[1:], x[:-1]))
+        self.__n_evicted = 0
+
+    @property
+    def acf1(self):
+        n = len(self.__values)
+        if n < 2:
+            return np.nan
+        else:
+            m = self.__sum_x / n
+            denominator = self.__sum_x2 - n * m * m
+            numerator = (
+                self.__sum_xx1
+                - m * (2 * self.__sum_x - self.__values[0] - self.__values[-1])
+                + (n - 1) * m * m
+            )
+            return (numerator / denominator if denominator > 0 else np.nan)
+
+    @property
+    def qstat(self):
+        n = len(self.__values)
+        return (n * (n + 2) * self.acf1 ** 2 / (n - 1) if n > 1 else np.nan)
+
+    @property
+    def pvalue(self):
+        q = self.qstat
+        return (erfc(sqrt(q / 2)) if q == q else np.nan)
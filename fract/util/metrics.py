@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_NULL_CONTEXT = nullcontext()
+
+
+class TurnMetrics(object):
+    # per-stage timers and counters exported with Prometheus text format
+    def __init__(self, path=None, interval_sec=60, prefix='fract'):
+        self.enabled = bool(path)
+        self.path = path
+        self.__interval_sec = float(interval_sec)
+        self.__prefix = prefix
+        self.__summaries = dict()
+        self.__counters = dict()
+        self.__gauges = dict()
+        self.__lock = threading.Lock()
+        self.__last_flush = time.monotonic()
+
+    def timer(self, stage):
+        if self.enabled:
+            return self._timer(name='stage_seconds', stage=stage)
+        else:
+            return _NULL_CONTEXT
+
+    @contextmanager
+    def _timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def observe(self, name, value, **labels):
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            with self.__lock:
+                s = self.__summaries.get(key)
+                if s:
+                    s[0] += 1
+                    s[1] += value
+                    s[2] = max(s[2], value)
+                else:
+                    self.__summaries[key] = [1, value, value]
+
+    def count(self, name, value=1, **labels):
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            with self.__lock:
+                self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            with self.__lock:
+                self.__gauges[key] = value
+
+    def to_prometheus(self):
+        with self.__lock:
+            summaries = {k: list(v) for k, v in self.__summaries.items()}
+            counters = dict(self.__counters)
+            gauges = dict(self.__gauges)
+        lines = list()
+        for metric_type, suffixes, items in [
+                (
+                    'summary', ['_count', '_sum'],
+                    {k: v[:2] for k, v in summaries.items()}
+                ),
+                (
+                    'gauge', ['_max'],
+                    {k: v[2:] for k, v in summaries.items()}
+                ),
+                ('counter', [''], {k: [v] for k, v in counters.items()}),
+                ('gauge', [''], {k: [v] for k, v in gauges.items()})
+        ]:
+            for name in sorted({k[0] for k in items.keys()}):
+                full_name = f'{self.__prefix}_{name}'
+                type_name = (
+                    full_name + suffixes[0] if metric_type == 'gauge'
+                    else full_name
+                )
+                lines.append(f'# TYPE {type_name} {metric_type}')
+                for (n, labels), values in sorted(items.items()):
+                    if n == name:
+                        label_str = (
+                            '{' + ','.join(
+                                f'{k}="{v}"' for k, v in labels
+                            ) + '}' if labels else ''
+                        )
+                        for s, v in zip(suffixes, values):
+                            lines.append(f'{full_name}{s}{label_str} {v}')
+        return '\n'.join(lines) + '\n'
+
+    def flush(self, force=False):
+        if self.enabled and (
+                force
+                or time.monotonic() - self.__last_flush >= self.__interval_sec
+        ):
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, self.path)
+            self.__last_flush = time.monotonic()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+
+import threading
+import time
+
+
+class TokenBucket(object):
+    def __init__(self, rate=100, capacity=None):
+        self.rate = float(rate)                 # tokens per second
+        self.capacity = float(capacity or rate)
+        self.__tokens = self.capacity
+        self.__last_time = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self, n=1):
+        while True:
+            with self.__lock:
+                t = time.monotonic()
+                self.__tokens = min(
+                    self.capacity,
+                    self.__tokens + (t - self.__last_time) * self.rate
+                )
+                self.__last_time = t
+                if self.__tokens >= n:
+                    self.__tokens -= n
+                    return
+                else:
+                    wait_sec = (n - self.__tokens) / self.rate
+            time.sleep(wait_sec)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pandas as pd
+
+
+class RingBuffer(object):
+    # fixed-size buffer of the latest rows with contiguous views
+    def __init__(self, size=5000, columns=('bid', 'ask', 'volume')):
+        self.size = max(int(size), 1)
+        self.columns = list(columns)
+        self.__capacity = self.size * 2
+        self.__start = 0
+        self.__end = 0
+        self.__arrays = {
+            'time': np.empty(self.__capacity, dtype=np.int64),
+            **{
+                k: np.empty(self.__capacity, dtype=np.float64)
+                for k in self.columns
+            }
+        }
+
+    def __len__(self):
+        return self.__end - self.__start
+
+    def view(self, name):
+        return self.__arrays[name][self.__start:self.__end]
+
+    def append(self, time, **kwargs):
+        len_new = min(len(time), self.size)
+        if not len_new:
+            return self
+        len_kept = min(len(self), self.size - len_new)
+        if self.__end + len_new > self.__capacity:
+            for a in self.__arrays.values():
+                a[:len_kept] = a[(self.__end - len_kept):self.__end]
+            self.__end = len_kept
+        s = slice(self.__end, self.__end + len_new)
+        self.__arrays['time'][s] = np.asarray(time)[-len_new:]
+        for k in self.columns:
+            self.__arrays[k][s] = (
+                np.asarray(kwargs[k])[-len_new:]
+                if np.ndim(kwargs[k]) else kwargs[k]
+            )
+        self.__end = s.stop
+        self.__start = self.__end - len_kept - len_new
+        return self
+
+    def to_df(self):
+        return pd.DataFrame(
+            {k: self.view(k) for k in self.columns},
+            index=pd.DatetimeIndex(
+                self.view('time').view('datetime64[ns]'), name='time'
+            ).tz_localize('UTC'),
+            copy=False
+        )
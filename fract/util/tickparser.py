@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def parse_ticks(strs):
+    decode = (orjson.loads if orjson else json.loads)
+    times = list()
+    bids = list()
+    asks = list()
+    tradeables = list()
+    for s in strs:
+        r = decode(s)
+        times.append(r['time'])
+        bids.append(r['closeoutBid'])
+        asks.append(r['closeoutAsk'])
+        tradeables.append(r['tradeable'])
+    return {
+        'time': parse_rfc3339_ns(times),
+        'bid': np.array(bids, dtype=np.float64),
+        'ask': np.array(asks, dtype=np.float64),
+        'tradeable': np.array(tradeables, dtype=bool)
+    }
+
+
+def parse_rfc3339_ns(strs):
+    if all(s.endswith('Z') for s in strs):
+        return np.array(
+            [s[:-1] for s in strs], dtype='datetime64[ns]'
+        ).view(np.int64)
+    else:
+        return pd.to_datetime(strs, utc=True).values.astype(
+            'datetime64[ns]'
+        ).view(np.int64)
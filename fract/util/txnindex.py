@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import os
+from tempfile import mkstemp
+
+
+class TransactionIndex(object):
+    # per-instrument PL summaries with raw transactions spilled to a file
+    def __init__(self, log_path=None):
+        self.__logger = logging.getLogger(__name__)
+        self.log_path = log_path    # raw transactions are appended here
+        self.__stats = dict()
+
+    def add(self, txns, write_log=True):
+        if txns:
+            if write_log:
+                if not self.log_path:
+                    fd, self.log_path = mkstemp(
+                        prefix='fract.txn.', suffix='.json.txt'
+                    )
+                    os.close(fd)
+                    self.__logger.info(f'Transaction log:\t{self.log_path}')
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(txns) + os.linesep)
+            for t in txns:
+                if t.get('instrument') and t.get('pl'):
+                    self._update_stats(t)
+        return self
+
+    def _update_stats(self, txn):
+        st = self.__stats.get(txn['instrument'])
+        if not st:
+            st = {'net_pl': 0.0, 'last_pl': None}
+            self.__stats[txn['instrument']] = st
+        pl = float(txn['pl'])
+        st['net_pl'] += pl
+        st['last_pl'] = pl
+
+    def net_pl(self, instrument):
+        st = self.__stats.get(instrument)
+        return (st['net_pl'] if st else 0.0)
+
+    def last_pl(self, instrument):
+        st = self.__stats.get(instrument)
+        return (st['last_pl'] if st else None)
+
+
+def read_txn_log(path):
+    # yield transaction batches written by TransactionIndex.add()
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
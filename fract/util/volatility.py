@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+
+
+class VolatilityTracker(object):
+    # volume-weighted rolling std of log returns and its running quantile
+    def __init__(self, window=6, size=5000, quantile=0.25):
+        self.window = max(int(window), 1)
+        self.size = int(size)                   # number of candles
+        self.quantile = float(quantile)
+        self.value = np.nan
+        self.__last_time = None
+        self.__last_log_mid = None
+        self.__returns = deque(maxlen=self.window)
+        self.__values = deque()
+        self.__sorted_values = list()
+
+    def __len__(self):
+        return len(self.__values)
+
+    def update(self, df_candle):
+        if df_candle.size:
+            time = df_candle.index.values.astype('datetime64[ns]').view(
+                np.int64
+            )
+            if self.__last_time is None or time[0] > self.__last_time:
+                self._reset()
+                k = 0
+            else:
+                k = int(np.searchsorted(time, self.__last_time, side='right'))
+            log_mids = np.log(
+                (df_candle['ask'].to_numpy() + df_candle['bid'].to_numpy())
+                / 2
+            )
+            volumes = df_candle['volume'].to_numpy(dtype=float)
+            for m, v in zip(log_mids[k:].tolist(), volumes[k:].tolist()):
+                if self.__last_log_mid is not None:
+                    self.__returns.append(m - self.__last_log_mid)
+                    if len(self.__returns) == self.window:
+                        self._push(value=(np.std(self.__returns) * v))
+                self.__last_log_mid = m
+            self.__last_time = int(time[-1])
+        return self
+
+    def _reset(self):
+        self.value = np.nan
+        self.__last_log_mid = None
+        self.__returns.clear()
+        self.__values.clear()
+        self.__sorted_values = list()
+
+    def _push(self, value):
+        self.value = value
+        self.__values.append(value)
+        insort(self.__sorted_values, value)
+        if len(self.__values) > max(self.size - self.window, 1):
+            old = self.__values.popleft()
+            del self.__sorted_values[bisect_left(self.__sorted_values, old)]
+
+    @property
+    def threshold(self):
+        # linear interpolation as pandas.Series.quantile()
+        n = len(self.__sorted_values)
+        if not n:
+            return np.nan
+        else:
+            pos = self.quantile * (n - 1)
+            lower = int(pos)
+            upper = min(lower + 1, n - 1)
+            return (
+                self.__sorted_values[lower] + (
+                    self.__sorted_values[upper] - self.__sorted_values[lower]
+                ) * (pos - lower)
+            )
+
+    @property
+    def is_active(self):
+        return bool(not len(self) or self.value > self.threshold)
@@ -22,6 +22,7 @@ setup(
         'docopt', 'numpy', 'oanda-cli', 'pandas', 'pyyaml', 'redis',
         'scikit-learn', 'statsmodels', 'v20'
     ],
+    extras_require={'orjson': ['orjson']},
     entry_points={'console_scripts': ['fract=fract.cli.main:main']},
     classifiers=[
         'Development Status :: 4 - Beta',
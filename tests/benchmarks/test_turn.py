@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+import logging
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from conftest import generate_candle_df, generate_txns
+
+from fract.model.backtest import BacktestTrader
+from fract.model.bet import BettingSystem
+from fract.model.ewma import Ewma
+from fract.model.feature import LogReturnFeature
+from fract.model.sieve import LRFeatureSieve
+from fract.util.history import generate_history_dfs
+from fract.util.kalmanfilter import KalmanFilterOptimizer
+
+pytest.importorskip('pytest_benchmark')
+
+
+def run_benchmark(benchmark, func, setup=None, rounds=50):
+    # pytest-benchmark stats plus p99 [ms] and peak traced memory [KiB]
+    result = benchmark.pedantic(
+        func, setup=setup, rounds=rounds, iterations=1
+    )
+    if benchmark.stats:
+        benchmark.extra_info['p99_ms'] = float(
+            np.percentile(benchmark.stats.stats.data, 99) * 1e3
+        )
+        args, kwargs = (setup() if setup else (tuple(), dict()))
+        tracemalloc.start()
+        func(*args, **kwargs)
+        benchmark.extra_info['peak_kib'] = (
+            tracemalloc.get_traced_memory()[1] / 1024
+        )
+        tracemalloc.stop()
+    return result
+
+
+@pytest.fixture(scope='module')
+def config_dict():
+    with open(
+            Path(__file__).resolve().parent.parent.parent.joinpath(
+                'fract/static/default_fract.yml'
+            )
+    ) as f:
+        cf = yaml.safe_load(f)
+    cf['oanda']['account_id'] = '101-001-0000000-001'
+    return cf
+
+
+@pytest.fixture(scope='module')
+def trader(config_dict):
+    # a backtest trader in the middle of 3 days of S5 rates
+    logging.disable(logging.CRITICAL)
+    end = pd.Timestamp('2021-01-08', tz='UTC')
+    history_dfs = generate_history_dfs(
+        instruments=['EUR_USD'], start=(end - pd.Timedelta(days=3)),
+        end=end, freq_sec=5, seed=0
+    )
+    trader = BacktestTrader(
+        model='ewma', config_dict=config_dict, history_dfs=history_dfs,
+        instruments=['EUR_USD'], step='S5',
+        start=(end - pd.Timedelta(days=1)), quiet=True
+    )
+    for _ in range(2):
+        next_turn(trader=trader)
+        trader.make_decision(instrument='EUR_USD')
+    yield trader
+    logging.disable(logging.NOTSET)
+
+
+def next_turn(trader):
+    if not trader.check_health():
+        raise RuntimeError('rate history exhausted')
+    trader._update_volatility_states()
+    trader.refresh_oanda_dicts()
+
+
+def sliding_setup(windows):
+    dfs = iter(windows)
+    return lambda: ((next(dfs),), dict())
+
+
+def test_log_return_feature_series(benchmark, candle_windows):
+    lrf = LogReturnFeature(type='LR Velocity')
+    run_benchmark(
+        benchmark, lambda: lrf.series(df_rate=candle_windows[0])
+    )
+
+
+def test_log_return_feature_series_sliding(benchmark, candle_windows):
+    lrf = LogReturnFeature(type='LR Velocity')
+    lrf.series(df_rate=candle_windows[0], key='M1')
+    run_benchmark(
+        benchmark, lambda df: lrf.series(df_rate=df, key='M1'),
+        setup=sliding_setup(candle_windows[1:]),
+        rounds=(len(candle_windows) - 2)
+    )
+
+
+def test_extract_best_feature(benchmark, trader, config_dict):
+    history_dict = {
+        g: trader._update_candle_df(
+            instrument='EUR_USD', granularity=g,
+            count=config_dict['feature']['cache']
+        ) for g in config_dict['feature']['granularities'] if g != 'TICK'
+    }
+    run_benchmark(
+        benchmark,
+        lambda: LRFeatureSieve(
+            type=config_dict['feature']['type']
+        ).extract_best_feature(history_dict=history_dict),
+        rounds=10
+    )
+
+
+def test_kalman_filter_optimizer(benchmark):
+    y = LogReturnFeature(type='LR Velocity').series(
+        df_rate=generate_candle_df(size=5000)
+    ).dropna()
+    run_benchmark(
+        benchmark,
+        lambda: KalmanFilterOptimizer(y=y, pmv_ratio=1e-3).optimize(),
+        rounds=10
+    )
+
+
+def test_ewm_stats_sliding(benchmark, candle_windows, config_dict):
+    lrf = LogReturnFeature(type='LR Velocity')
+    ewma = Ewma(config_dict=config_dict)
+    ewma._ewm_stats(
+        *lrf.unscaled_series(df_rate=candle_windows[0], key='M1'), key='M1'
+    )
+    run_benchmark(
+        benchmark,
+        lambda df: ewma._ewm_stats(
+            *lrf.unscaled_series(df_rate=df, key='M1'), key='M1'
+        ),
+        setup=sliding_setup(candle_windows[1:]),
+        rounds=(len(candle_windows) - 2)
+    )
+
+
+def test_betting_system_calculate_size(benchmark, config_dict):
+    bs = BettingSystem(strategy=config_dict['position']['bet']).update(
+        generate_txns(size=1000, instruments=('EUR_USD',))
+    )
+    run_benchmark(
+        benchmark,
+        lambda: bs.calculate_size(instrument='EUR_USD', unit_size=1000),
+        rounds=1000
+    )
+
+
+def test_determine_sig_state(benchmark, trader):
+    def latest_rate():
+        df_r = pd.DataFrame()
+        while df_r.empty:
+            next_turn(trader=trader)
+            df_r = trader._fetch_rate_df(instrument='EUR_USD')
+        return (tuple(), {'df_rate': df_r})
+
+    run_benchmark(benchmark, trader.determine_sig_state, setup=latest_rate)
+
+
+def test_make_decision(benchmark, trader):
+    run_benchmark(
+        benchmark, lambda: trader.make_decision(instrument='EUR_USD'),
+        setup=lambda: (next_turn(trader=trader) or (tuple(), dict()))
+    )
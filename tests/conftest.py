@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def generate_candle_df(size, seed=0, freq_sec=60):
+    # random walk with repeated prices and a strong volume trend
+    rng = np.random.default_rng(seed)
+    mid = np.exp(np.cumsum(rng.normal(scale=1e-4, size=size)))
+    mid[rng.random(size) < 0.2] = np.nan
+    mid = pd.Series(mid).ffill().bfill().to_numpy()
+    spread = rng.uniform(1e-5, 3e-5, size=size)
+    return pd.DataFrame(
+        {
+            'ask': mid + spread, 'bid': mid - spread,
+            'volume': rng.poisson(
+                lam=(10 * np.exp(np.linspace(0, 4, size)))
+            ) + 1
+        },
+        index=pd.Index(
+            pd.to_datetime(
+                1600000000 + np.arange(size) * freq_sec, unit='s', utc=True
+            ).as_unit('ns'),
+            name='time'
+        )
+    )
+
+
+def generate_txns(size, instruments=('EUR_USD', 'USD_JPY'), seed=0):
+    # closing, opening, and financing transactions of a few instruments
+    rng = np.random.default_rng(seed)
+    txns = list()
+    for k in range(size):
+        t = {'id': str(k + 1), 'instrument': instruments[k % len(instruments)]}
+        r = rng.random()
+        if r < 0.6:
+            t['units'] = str(int(rng.integers(-9, 10)) * 1000)
+            t['pl'] = (
+                '0.0' if rng.random() < 0.4
+                else '{:.4f}'.format(rng.normal())
+            )
+        elif r < 0.8:
+            t['financing'] = '{:.4f}'.format(rng.normal() * 1e-2)
+        txns.append(t)
+    return txns
+
+
+@pytest.fixture
+def candle_windows():
+    # sliding windows of 1000 candles with a few new candles per turn
+    df = generate_candle_df(size=1300)
+    return [df.iloc[i:(i + 1000)] for i in range(0, 300, 7)]
+
+
+@pytest.fixture(params=range(10))
+def txns(request):
+    return generate_txns(size=300, seed=request.param)
+
+
+@pytest.fixture(autouse=True)
+def temp_dir(tmp_path, monkeypatch):
+    # spilled transaction logs are written in each test directory
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    return tmp_path
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pandas as pd
+import pytest
+import v20
+
+from fract.model.backtest import BacktestTrader
+from fract.model.base import TraderCore
+from fract.model.broker import SimulatedBroker, SimulatedContext
+from fract.util.history import generate_history_dfs
+
+
+@pytest.fixture
+def history_dfs():
+    dfs = generate_history_dfs(
+        instruments=['EUR_USD'], start='2024-01-01',
+        end='2024-01-01T05:59:55', freq_sec=5, seed=0
+    )
+    for df in dfs.values():
+        for k in ['bid', 'ask']:
+            df[f'{k}_high'] = df[k] + 1e-5
+            df[f'{k}_low'] = df[k] - 1e-5
+    return dfs
+
+
+@pytest.fixture
+def config_dict():
+    return {
+        'oanda': {'account_id': '001'},
+        'instruments': ['EUR_USD'],
+        'position': {'bet': 'Martingale', 'side': 'auto'},
+        'feature': {
+            'type': 'LR Velocity', 'cache': 500, 'granularity_lock': False,
+            'granularities': ['S5', 'M1', 'M5']
+        },
+        'model': {'ewma': {'alpha': 0.02, 'sigma_band': 1}},
+        'volatility': {'sleeping': 0}
+    }
+
+
+def test_simulated_context_returns_v20_objects(history_dfs):
+    broker = SimulatedBroker(
+        history_dfs=history_dfs, account_id='001',
+        start=pd.Timestamp('2024-01-01T01:00:00Z').value
+    )
+    api = SimulatedContext(broker=broker)
+    res = api.account.get(accountID='001')
+    assert isinstance(res.body['account'], v20.account.Account)
+    assert res.body['account'].balance == 1000000
+    res = api.order.market(
+        accountID='001', instrument='EUR_USD', units=1000
+    )
+    assert res.status == 201
+    assert isinstance(
+        res.body['orderFillTransaction'],
+        v20.transaction.OrderFillTransaction
+    )
+    assert res.raw_body
+    res = api.transaction.since(accountID='001', id=0)
+    assert [t.type for t in res.body['transactions']] == [
+        'MARKET_ORDER', 'ORDER_FILL'
+    ]
+    res = api.pricing.get(accountID='001', instruments='EUR_USD')
+    assert isinstance(res.body['prices'][0], v20.pricing.ClientPrice)
+
+
+def test_simulated_orders_net_opposite_trades(history_dfs):
+    broker = SimulatedBroker(
+        history_dfs=history_dfs, account_id='001',
+        start=pd.Timestamp('2024-01-01T01:00:00Z').value
+    )
+    api = SimulatedContext(broker=broker)
+
+    def net_units():
+        positions = api.account.get(accountID='001').body['account'].positions
+        return sum(p.long.units + p.short.units for p in positions)
+
+    for units, expected in [
+            (1000, 1000), (-400, 600), (-1600, -1000), (3000, 2000),
+            (-2000, 0)
+    ]:
+        res = api.order.market(
+            accountID='001', instrument='EUR_USD', units=units
+        )
+        assert res.status == 201
+        assert net_units() == expected
+    fill = res.body['orderFillTransaction']
+    assert fill.tradesClosed[0].units == -2000
+    assert fill.tradeOpened is None
+
+
+def test_candles_match_the_api(history_dfs, config_dict):
+    trader = BacktestTrader(
+        model='ewma', config_dict=config_dict, history_dfs=history_dfs,
+        start='2024-01-01T02:00:00Z', quiet=True
+    )
+    for _ in range(30):
+        assert trader.check_health()
+        for g in ['S5', 'M1', 'M5']:
+            df = trader._update_candle_df(
+                instrument='EUR_USD', granularity=g, count=500
+            )
+            expected = TraderCore.fetch_candle_df(
+                trader, instrument='EUR_USD', granularity=g, count=500
+            )
+            pd.testing.assert_frame_equal(
+                df, expected[['ask', 'bid', 'volume']], check_freq=False
+            )
+            assert np.all(df.index <= trader.now())
+            assert trader._update_candle_df(
+                instrument='EUR_USD', granularity=g, count=500
+            ) is df
+            from_time = df.index[-10].strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+            pd.testing.assert_frame_equal(
+                trader.fetch_candle_df(
+                    instrument='EUR_USD', granularity=g, count=500,
+                    from_time=from_time
+                ),
+                TraderCore.fetch_candle_df(
+                    trader, instrument='EUR_USD', granularity=g, count=500,
+                    from_time=from_time
+                ),
+                check_freq=False
+            )
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+import json
+from types import SimpleNamespace
+
+from fract.model.base import TraderCore
+
+
+class FakeTransactionAPI(object):
+    def __init__(self):
+        self.calls = list()
+
+    def list(self, **kwargs):
+        self.calls.append(('list', kwargs))
+        return SimpleNamespace(status=200, body={'lastTransactionID': '9'})
+
+    def since(self, **kwargs):
+        self.calls.append(('since', kwargs))
+        return SimpleNamespace(status=200, body={'lastTransactionID': '9'})
+
+
+def test_replay_resumes_from_last_logged_transaction(tmp_path):
+    (tmp_path / 'txn.json.txt').write_text(
+        json.dumps([
+            {
+                'id': '3', 'accountID': '001', 'instrument': 'EUR_USD',
+                'units': '-1000', 'pl': '1.5'
+            },
+            {
+                'id': '4', 'accountID': '001', 'instrument': 'EUR_USD',
+                'units': '1000', 'pl': '0.0'
+            }
+        ]) + '\n' + json.dumps([
+            {
+                'id': '8', 'accountID': '002', 'instrument': 'EUR_USD',
+                'units': '-1000', 'pl': '-2.0'
+            }
+        ]) + '\n'
+    )
+    txn_api = FakeTransactionAPI()
+    trader = TraderCore(
+        config_dict={
+            'oanda': {
+                'account_id': '001', 'rate_limit': 0, 'max_workers': 1
+            },
+            'position': {'bet': 'Martingale'}, 'feature': dict(),
+            'model': dict()
+        },
+        instruments=['EUR_USD'], log_dir_path=str(tmp_path),
+        api=SimpleNamespace(transaction=txn_api)
+    )
+    assert trader.txn_index.net_pl(instrument='EUR_USD') == 1.5
+    trader._refresh_txn_list()
+    assert txn_api.calls == [('since', {'accountID': '001', 'id': '4'})]
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import pytest
+
+from fract.model.bet import BettingSystem
+
+
+def scan_pl_txns(txns, instrument):
+    return [
+        t for t in txns
+        if t.get('instrument') == instrument and t.get('pl')
+        and t.get('units')
+    ]
+
+
+@pytest.mark.parametrize(
+    'strategy',
+    [
+        'Martingale', 'Paroli', "d'Alembert", "Reverse d'Alembert",
+        'Pyramid', "Oscar's grind"
+    ]
+)
+def test_calculate_size_matches_calculate_size_by_pl(txns, strategy):
+    bs = BettingSystem(strategy=strategy)
+    ref = BettingSystem(strategy=strategy)
+    for k, t in enumerate(txns):
+        bs.update([t])
+        i = t['instrument']
+        assert bs.calculate_size(
+            instrument=i, unit_size=1000, init_size=2000
+        ) == ref.calculate_size_by_pl(
+            unit_size=1000, init_size=2000,
+            inst_pl_txns=scan_pl_txns(txns=txns[:(k + 1)], instrument=i)
+        ), k
+
+
+def test_rebuild_matches_update(txns):
+    bs = BettingSystem()
+    for t in txns:
+        bs.update([t])
+    rebuilt = BettingSystem().rebuild(txns)
+    for i in {t['instrument'] for t in txns}:
+        assert bs.state(instrument=i) == rebuilt.state(instrument=i)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fract.model.ewma import Ewma
+from fract.model.feature import LogReturnFeature
+from fract.util.ewm import RollingEwm
+
+
+@pytest.mark.parametrize('alpha', [0.02, 0.5])
+def test_rolling_ewm_matches_pandas(alpha):
+    rng = np.random.default_rng(0)
+    x = rng.normal(scale=1e-5, size=3000)
+    x[rng.random(x.size) < 0.01] = np.nan
+    pandas_ewm = pd.Series(x).ewm(alpha=alpha)
+    ewma = pandas_ewm.mean().to_numpy()
+    ewmstd = pandas_ewm.std().to_numpy()
+    ewm = RollingEwm(alpha=alpha)
+    for i, x_i in enumerate(x):
+        ewm.append(times=[i], values=[x_i])
+        assert ewm.mean == pytest.approx(ewma[i], rel=1e-9, nan_ok=True)
+        assert ewm.std == pytest.approx(ewmstd[i], rel=1e-6, nan_ok=True)
+
+
+@pytest.mark.parametrize('alpha', [0.02, 0.5])
+def test_rolling_ewm_evicts_old_values(alpha):
+    rng = np.random.default_rng(1)
+    x = pd.Series(rng.normal(loc=1e-5, scale=1e-5, size=3000))
+    x[rng.random(x.size) < 0.01] = np.nan
+    ewm = RollingEwm(alpha=alpha).append(
+        times=x.index[:1000], values=x.iloc[:1000]
+    )
+    for i in range(13, 2000, 13):
+        ewm.append(
+            times=x.index[(i + 987):(i + 1000)],
+            values=x.iloc[(i + 987):(i + 1000)]
+        ).evict(before=i)
+        pandas_ewm = x.iloc[i:(i + 1000)].ewm(alpha=alpha)
+        assert len(ewm) == 1000
+        assert ewm.mean == pytest.approx(
+            pandas_ewm.mean().iloc[-1], rel=1e-9
+        )
+        assert ewm.std == pytest.approx(pandas_ewm.std().iloc[-1], rel=1e-6)
+
+
+def test_ewm_stats_follow_rescaled_windows(candle_windows):
+    alpha = 0.02
+    ewma = Ewma(
+        config_dict={
+            'model': {'ewma': {'alpha': alpha, 'sigma_band': 1}},
+            'feature': {'type': 'LR Velocity'}
+        }
+    )
+    lrf = LogReturnFeature(type='LR Velocity')
+    for df in candle_windows:
+        series, scale = lrf.unscaled_series(df_rate=df)
+        sig_dict = ewma._ewm_stats(
+            series=series.dropna(), scale=scale, key='M1'
+        )
+        pandas_ewm = lrf.series(df_rate=df).dropna().ewm(alpha=alpha)
+        mean = pandas_ewm.mean().iloc[-1]
+        std = pandas_ewm.std().iloc[-1]
+        assert sig_dict['ewma'] == pytest.approx(mean, rel=1e-9)
+        assert sig_dict['ewmbb'] == pytest.approx(
+            np.array([mean - std, mean + std]), rel=1e-6
+        )
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import generate_candle_df
+
+from fract.model.feature import LogReturnFeature
+
+
+def pandas_feature_df(df_rate, drop_zero=False):
+    df_lr = df_rate.reset_index().assign(
+        log_diff=lambda d: np.log(d[['ask', 'bid']].mean(axis=1)).diff(),
+        delta_sec=lambda d: d['time'].diff().dt.total_seconds()
+    ).assign(
+        log_return=lambda d: d.assign(
+            weight=lambda e: np.reciprocal(
+                np.log(e['ask']) - np.log(e['bid'])
+            ).pipe(
+                lambda s: (s / s.mean()) * (e['volume'] / e['volume'].mean())
+            )
+        ).pipe(lambda e: e['log_diff'] * e['weight'])
+    ).pipe(
+        lambda d: (
+            d.iloc[d['log_return'].to_numpy().nonzero()[0]] if drop_zero
+            else d
+        )
+    )
+    return df_lr.assign(
+        lrv=lambda d: d['log_return'] / d['delta_sec']
+    ).assign(
+        lra=lambda d: d['lrv'].diff() / d['delta_sec']
+    )
+
+
+@pytest.mark.parametrize('drop_zero', [False, True])
+@pytest.mark.parametrize(
+    'method, columns', [
+        ('log_return', ['log_diff', 'delta_sec', 'log_return']),
+        (
+            'log_return_velocity',
+            ['log_diff', 'delta_sec', 'log_return', 'lrv']
+        ),
+        (
+            'log_return_acceleration',
+            ['log_diff', 'delta_sec', 'log_return', 'lrv', 'lra']
+        )
+    ]
+)
+def test_return_df_matches_pandas(method, columns, drop_zero):
+    df_rate = generate_candle_df(size=500)
+    expected = pandas_feature_df(df_rate=df_rate, drop_zero=drop_zero)[
+        ['time', 'ask', 'bid', 'volume', *columns]
+    ]
+    lrf = LogReturnFeature(type='LR', drop_zero=drop_zero)
+    df = getattr(lrf, method)(df_rate=df_rate, return_df=True)
+    pd.testing.assert_frame_equal(df, expected, check_exact=False, rtol=1e-9)
+
+
+def test_series_is_indexed_by_time():
+    df_rate = generate_candle_df(size=500)
+    s = LogReturnFeature(type='LR Velocity').series(df_rate=df_rate)
+    expected = pandas_feature_df(df_rate=df_rate)['lrv']
+    pd.testing.assert_index_equal(s.index, df_rate.index)
+    np.testing.assert_allclose(s.to_numpy(), expected.to_numpy(), rtol=1e-9)
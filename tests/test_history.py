@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from fract.util.history import read_history_dfs
+
+
+def test_read_history_dfs_from_sqlite(tmp_path):
+    path = tmp_path / 'rate.sqlite3'
+    with sqlite3.connect(str(path)) as con:
+        pd.DataFrame({
+            'time': ['2024-01-01T00:00:00Z', '2024-01-01T00:00:05Z'],
+            'instrument': ['EUR_USD', 'EUR_USD'], 'bid': [1.0, 1.1],
+            'ask': [1.2, 1.3], 'volume': [3, 4]
+        }).to_sql('candle', con, index=False)
+        pd.DataFrame({'name': ['x']}).to_sql('other', con, index=False)
+    df = read_history_dfs(path=str(path))['EUR_USD']
+    assert df['bid'].tolist() == [1.0, 1.1]
+    assert df['volume'].tolist() == [3, 4]
+    assert str(df.index.tz) == 'UTC'
+
+
+def test_read_history_dfs_without_rate_table(tmp_path):
+    path = tmp_path / 'rate.sqlite3'
+    with sqlite3.connect(str(path)) as con:
+        pd.DataFrame({'name': ['x']}).to_sql('other', con, index=False)
+    with pytest.raises(ValueError):
+        read_history_dfs(path=str(path))
+
+
+def test_read_history_dfs_from_sqlite_directory(tmp_path):
+    for i, d in enumerate(['2024-01-01', '2024-01-02']):
+        with sqlite3.connect(str(tmp_path / f'rate{i}.db')) as con:
+            pd.DataFrame({
+                'time': [f'{d}T00:00:00Z'], 'instrument': ['EUR_USD'],
+                'bid': [1.0 + i], 'ask': [1.2 + i]
+            }).to_sql('pricing_stream', con, index=False)
+    (tmp_path / 'README.txt').write_text('not a rate file')
+    df = read_history_dfs(path=str(tmp_path))['EUR_USD']
+    assert df['bid'].tolist() == [1.0, 2.0]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import pytest
+
+from fract.model.feature import LogReturnFeature
+from fract.model.kalman import Kalman
+from fract.util.kalmanfilter import KalmanFilter
+
+
+def test_warm_kf_state_matches_cold_filter(candle_windows):
+    kalman = Kalman(
+        config_dict={
+            'model': {
+                'kalman': {
+                    'pmv_ratio': 1e-3, 'alpha': 0.01, 'optimize_interval': 100
+                }
+            },
+            'feature': {'type': 'LR Velocity'}
+        }
+    )
+    lrf = LogReturnFeature(type='LR Velocity', drop_zero=True)
+    for df in candle_windows:
+        y, scale = lrf.unscaled_series(df_rate=df)
+        kf_res = kalman._update_kf_state(y=y.dropna(), scale=scale, key='M1')
+        x, v = KalmanFilter.filter(
+            y=lrf.series(df_rate=df).dropna().to_numpy(), x0=0, v0=1e-8,
+            q=kf_res['q'], r=kf_res['r']
+        )
+        assert kf_res['x'] == pytest.approx(x[-1], rel=1e-6)
+        assert kf_res['v'] == pytest.approx(v[-1], rel=1e-6)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import json
+import logging
+
+import pytest
+import redis
+
+from fract.model.kvs import RedisTrader
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+class NonBlockingRedis(fakeredis.FakeStrictRedis):
+    def xreadgroup(self, *args, block=None, **kwargs):
+        # blocking reads of fakeredis miss entries added beforehand
+        return super().xreadgroup(*args, **kwargs)
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis, 'StrictRedis',
+        lambda connection_pool=None: NonBlockingRedis(server=server)
+    )
+    return server
+
+
+def test_stream_entries_without_data_are_warned(redis_server, caplog):
+    trader = RedisTrader(
+        model='ewma', instruments=['EUR_USD'], redis_mode='stream',
+        config_dict={
+            'oanda': {
+                'environment': 'practice', 'token': 'x', 'account_id': '001',
+                'rate_limit': 0, 'max_workers': 1
+            },
+            'position': {'bet': 'Martingale'},
+            'feature': {
+                'type': 'LR Velocity', 'cache': 500, 'granularities': ['S5']
+            },
+            'model': {'ewma': {'alpha': 0.02, 'sigma_band': 1}}
+        }
+    )
+    redis_c = fakeredis.FakeStrictRedis(server=redis_server)
+    redis_c.xgroup_create(
+        name='EUR_USD', groupname='fract', id='$', mkstream=True
+    )
+    price = {
+        'time': '2024-01-01T00:00:00.000000000Z', 'closeoutBid': '1.1000',
+        'closeoutAsk': '1.1002', 'tradeable': True
+    }
+    redis_c.xadd('EUR_USD', {'data': json.dumps(price)})
+    redis_c.xadd('EUR_USD', {'price': json.dumps(price)})
+    with caplog.at_level(logging.WARNING):
+        trader._read_rate_streams()
+    assert 'no data field in a stream entry' in caplog.text
+    df_r = trader._fetch_rate_df(instrument='EUR_USD')
+    assert df_r['bid'].tolist() == [1.1]
+    assert redis_c.xlen('EUR_USD') == 0
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+import pytest
+from conftest import generate_candle_df
+from statsmodels.stats.diagnostic import acorr_ljungbox
+
+from fract.model.feature import LogReturnFeature
+from fract.model.sieve import LRFeatureSieve
+
+
+@pytest.mark.parametrize('drop_zero', [False, True])
+@pytest.mark.parametrize(
+    'type', ['Log Return', 'LR Velocity', 'LR Acceleration']
+)
+def test_rolling_ljungbox_matches_statsmodels(candle_windows, type,
+                                              drop_zero):
+    lrfs = LRFeatureSieve(type=type, drop_zero=drop_zero)
+    lrf = LogReturnFeature(type=type, drop_zero=drop_zero)
+    for df in candle_windows:
+        pvalue = lrfs._fetch_feature(
+            df_rate=df, key=('EUR_USD', 'M1'), with_pvalue=True
+        )['pvalue']
+        expected = acorr_ljungbox(
+            x=lrf.series(df_rate=df).dropna(), lags=1, return_df=True
+        ).iloc[0]['lb_pvalue']
+        assert pvalue == pytest.approx(expected, rel=1e-6, abs=1e-300)
+
+
+def test_best_feature_is_scaled_series(candle_windows):
+    lrfs = LRFeatureSieve(type='LR Velocity')
+    lrf = LogReturnFeature(type='LR Velocity')
+    for df in candle_windows:
+        best_f = lrfs.extract_best_feature(
+            history_dict={'M1': df}, instrument='EUR_USD'
+        )
+        assert best_f['series'].to_numpy() == pytest.approx(
+            lrf.series(df_rate=df).dropna().to_numpy(), rel=1e-12
+        )
+        assert best_f['unscaled_series'].to_numpy() * best_f['scale'] == (
+            pytest.approx(best_f['series'].to_numpy(), rel=1e-12)
+        )
+
+
+def test_pooled_sieve_matches_serial():
+    dfs = {f'G{i}': generate_candle_df(size=1300, seed=i) for i in range(6)}
+    serial = LRFeatureSieve(type='LR Velocity')
+    pooled = LRFeatureSieve(type='LR Velocity', workers=4)
+    for k in range(0, 300, 7):
+        history_dict = {g: d.iloc[k:(k + 1000)] for g, d in dfs.items()}
+        expected = serial.extract_best_feature(
+            history_dict=history_dict, instrument='EUR_USD'
+        )
+        best_f = pooled.extract_best_feature(
+            history_dict=history_dict, instrument='EUR_USD'
+        )
+        assert best_f['granularity'] == expected['granularity']
+        assert best_f['series'].equals(expected['series'])
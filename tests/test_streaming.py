@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fract.model import standalone
+from fract.model.standalone import StandaloneTrader
+from fract.model.streaming import PriceStream
+
+
+def test_stream_hostname_ignores_the_rest_host():
+    oanda_cf = {
+        'account_id': '001', 'token': '', 'environment': 'practice',
+        'hostname': 'api.example.com'
+    }
+    assert PriceStream(
+        config_dict={'oanda': oanda_cf}, instruments=['EUR_USD']
+    ).api.hostname == 'stream-fxpractice.oanda.com'
+    assert PriceStream(
+        config_dict={
+            'oanda': {**oanda_cf, 'stream_hostname': 'stream.example.com'}
+        },
+        instruments=['EUR_USD']
+    ).api.hostname == 'stream.example.com'
+
+
+class FakeHeartbeatAPI(object):
+    # a pricing stream that only sends heartbeats
+    def __init__(self, interval_sec=0.02):
+        self.pricing = SimpleNamespace(stream=self._stream)
+        self.__interval_sec = interval_sec
+
+    def _stream(self, **kwargs):
+        def parts():
+            while True:
+                yield (
+                    'pricing.PricingHeartbeat',
+                    SimpleNamespace(type='HEARTBEAT')
+                )
+                time.sleep(self.__interval_sec)
+
+        return SimpleNamespace(status=200, parts=parts)
+
+
+def test_heartbeats_keep_the_standalone_trader_alive(monkeypatch):
+    streams = list()
+
+    class HeartbeatPriceStream(PriceStream):
+        def __init__(self, **kwargs):
+            super().__init__(api=FakeHeartbeatAPI(), **kwargs)
+            streams.append(self)
+
+    monkeypatch.setattr(standalone, 'PriceStream', HeartbeatPriceStream)
+    trader = StandaloneTrader(
+        model='ewma', instruments=['EUR_USD'], interval_sec=0.01,
+        timeout_sec=1,
+        config_dict={
+            'oanda': {
+                'environment': 'practice', 'token': '', 'account_id': '001',
+                'rate_limit': 0, 'max_workers': 1, 'price_stream': True,
+                'stream_timeout_sec': 1
+            },
+            'position': {'bet': 'Martingale'},
+            'feature': {
+                'type': 'LR Velocity', 'cache': 500, 'granularities': ['S5']
+            },
+            'model': {'ewma': {'alpha': 0.02, 'sigma_band': 1}}
+        }
+    )
+    stream = streams[0].start()
+    try:
+        for _ in range(100):
+            if stream.is_fresh:
+                break
+            time.sleep(0.01)
+        # no tick for longer than the timeout since the last decision
+        trader._StandaloneTrader__latest_update_time = (
+            datetime.now() - timedelta(seconds=10)
+        )
+        assert trader.check_health()
+        assert trader.select_instruments() == list()
+        assert trader.check_health()
+    finally:
+        stream.stop()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+import pytest
+
+from fract.call import trader
+
+
+class FakeTrader(object):
+    instances = list()
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        FakeTrader.instances.append(self)
+
+    def invoke(self):
+        pass
+
+
+@pytest.mark.parametrize('standalone', [True, False])
+@pytest.mark.parametrize('dry_run', [True, False])
+def test_run_trader_passes_dry_run(monkeypatch, standalone, dry_run):
+    monkeypatch.setattr(trader, 'StandaloneTrader', FakeTrader)
+    monkeypatch.setattr(trader, 'RedisTrader', FakeTrader)
+    FakeTrader.instances = list()
+    trader._run_trader(
+        config_dict=dict(), instruments=['EUR_USD'], model='ewma',
+        interval_sec=0, timeout_sec=None, standalone=standalone,
+        redis_host=None, redis_port=None, redis_db=None, log_dir_path=None,
+        ignore_api_error=False, quiet=True, dry_run=dry_run
+    )
+    assert FakeTrader.instances[0].kwargs['dry_run'] is dry_run
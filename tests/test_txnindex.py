@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from fract.util.txnindex import TransactionIndex, read_txn_log
+
+
+def test_index_matches_full_list_scan(txns, tmp_path):
+    index = TransactionIndex(log_path=str(tmp_path / 'txn.json.txt'))
+    for k, t in enumerate(txns):
+        index.add([t])
+        i = t['instrument']
+        inst_pls = [
+            p['pl'] for p in txns[:(k + 1)]
+            if p.get('instrument') == i and p.get('pl')
+        ]
+        assert index.last_pl(instrument=i) == (
+            float(inst_pls[-1]) if inst_pls else None
+        )
+        assert np.isclose(
+            index.net_pl(instrument=i), sum(float(p) for p in inst_pls)
+        )
+    assert [t for b in read_txn_log(path=index.log_path) for t in b] == txns
+
+
+def test_transactions_are_spilled_without_log_path(txns, temp_dir):
+    index = TransactionIndex().add(txns[:10]).add(txns[10:])
+    assert index.log_path.startswith(str(temp_dir))
+    assert list(read_txn_log(path=index.log_path)) == [txns[:10], txns[10:]]
+    replayed = TransactionIndex()
+    for b in read_txn_log(path=index.log_path):
+        replayed.add(b, write_log=False)
+    assert replayed.log_path is None
+    assert replayed.net_pl(instrument='EUR_USD') == index.net_pl(
+        instrument='EUR_USD'
+    )